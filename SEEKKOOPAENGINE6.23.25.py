@@ -1,9 +1,16 @@
 import pygame
 import sys
+import os
 import math
 import random
+import hashlib
+import types
+import zlib
+import numpy as np
 from pygame.locals import *
 
+import koopaengine as engine
+
 # Constants
 SCALE = 2
 TILE = 16
@@ -50,11 +57,52 @@ state = GameState()
 
 # Scene management
 SCENES = []
+# Deepest the stack may get; past it the oldest scenes are dropped
+MAX_SCENES = 8
+# Reusable scenes, one per pooled type
+SCENE_POOL = {}
 
-def push(scene): SCENES.append(scene)
+def push(scene):
+    SCENES.append(scene)
+    del SCENES[:-MAX_SCENES]
+    
 def pop(): SCENES.pop()
 
+def replace(scene):
+    # Swap the current scene for another, letting the old one go
+    if SCENES:
+        SCENES.pop()
+    push(scene)
+    
+def pop_to(scene_type):
+    # Unwind to the nearest scene of this type, or start over from a new one
+    # if it has fallen off the stack
+    while SCENES and not isinstance(SCENES[-1], scene_type):
+        SCENES.pop()
+    if SCENES:
+        SCENES[-1].enter()
+    else:
+        push(from_pool(scene_type) if scene_type.pooled else scene_type())
+        
+def reset_to(scene):
+    # Drop every scene and start from this one
+    SCENES.clear()
+    push(scene)
+    
+def from_pool(scene_type):
+    # The pooled instance of a scene type, set up as if new
+    scene = SCENE_POOL.get(scene_type)
+    if scene is None:
+        scene = SCENE_POOL[scene_type] = scene_type()
+    else:
+        scene.enter()
+    return scene
+
 class Scene:
+    # Pooled scenes are reused through from_pool() instead of being rebuilt
+    pooled = False
+    
+    def enter(self): ...  # Shown again, by from_pool() or pop_to()
     def handle(self, events, keys): ...
     def update(self, dt): ...
     def draw(self, surf): ...
@@ -71,93 +119,206 @@ WORLD_THEMES = {
     8: {"sky": 20, "ground": 27, "pipe": 21, "block": 40, "water": None, "enemy": "W", "name": "FINAL FORTRESS"}
 }
 
-# Generate 32 levels (8 worlds * 4 levels)
-def generate_level_data():
-    levels = {}
-    for world in range(1, 9):
-        for level in range(1, 5):
-            level_id = f"{world}-{level}"
-            theme = WORLD_THEMES[world]
-            
-            # Create a unique level pattern for each level
-            level_data = []
-            
-            # Sky
-            for i in range(10):
-                level_data.append(" " * 100)
-                
-            # Platforms
-            for i in range(10, 15):
-                level_data.append(" " * 100)
-                
-            # Ground
-            for i in range(15, 20):
-                if i == 15:
-                    row = "G" * 100
-                else:
-                    row = "B" * 100
-                level_data.append(row)
-            
-            # Add platforms
-            for i in range(5 + level):  # More platforms in later levels
-                platform_y = random.randint(8, 12)
-                platform_x = random.randint(10 + i*20, 15 + i*20)
-                length = random.randint(4, 8)
-                for j in range(length):
-                    level_data[platform_y] = level_data[platform_y][:platform_x+j] + "P" + level_data[platform_y][platform_x+j+1:]
-            
-            # Add pipes
-            for i in range(2 + level//2):  # More pipes in later levels
-                pipe_x = random.randint(20 + i*30, 25 + i*30)
-                pipe_height = random.randint(2, 4)
-                for j in range(pipe_height):
-                    level_data[19-j] = level_data[19-j][:pipe_x] + "T" + level_data[19-j][pipe_x+1:]
-                    level_data[19-j] = level_data[19-j][:pipe_x+1] + "T" + level_data[19-j][pipe_x+2:]
-            
-            # Add bricks and question blocks
-            for i in range(8 + level):  # More blocks in later levels
-                block_y = random.randint(5, 10)
-                block_x = random.randint(5 + i*10, 8 + i*10)
-                block_type = "?" if random.random() > 0.5 else "B"
-                level_data[block_y] = level_data[block_y][:block_x] + block_type + level_data[block_y][block_x+1:]
-            
-            # Add player start
-            level_data[14] = level_data[14][:5] + "S" + level_data[14][6:]
-            
-            # Add flag at end
-            level_data[14] = level_data[14][:95] + "F" + level_data[14][96:]
-            
-            # Add enemies
-            for i in range(5 + level):  # More enemies in later levels
-                enemy_y = 14
-                enemy_x = random.randint(20 + i*15, 25 + i*15)
-                enemy_type = theme["enemy"]
-                level_data[enemy_y] = level_data[enemy_y][:enemy_x] + enemy_type + level_data[enemy_y][enemy_x+1:]
-            
-            levels[level_id] = level_data
-    
-    return levels
+# Levels come from a fixed seed per level, so every launch plays the same ones
+LEVEL_SEED = "seekkoopa"
+LEVEL_IDS = [f"{world}-{level}" for world in range(1, 9) for level in range(1, 5)]
+
+# Generated levels are kept here between runs
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".koopa_cache")
 
-LEVELS = generate_level_data()
+def code_signature(code):
+    # Bytecode and constants of a function's code, for cache keys. Nested code
+    # objects (comprehensions, lambdas) go in by content, since their repr
+    # carries a memory address that changes every run
+    return (code.co_code, tuple(code_signature(const) if isinstance(const, types.CodeType) else const
+                                for const in code.co_consts))
 
-# Create thumbnails
-THUMBNAILS = {}
-for level_id, level_data in LEVELS.items():
-    world = int(level_id.split("-")[0])
+def put_tile(row, x, char):
+    # Same as row[:x] + char + row[x+1:] on a string: past the end it appends
+    if x < len(row):
+        row[x] = ord(char)
+    else:
+        row.append(ord(char))
+
+# Generate one of the 32 levels (8 worlds * 4 levels)
+def generate_level(level_id):
+    world, level = (int(part) for part in level_id.split("-"))
     theme = WORLD_THEMES[world]
+    rng = random.Random(f"{LEVEL_SEED}-{level_id}")
+    
+    # Create a unique level pattern for each level
+    level_data = []
     
-    thumb = pygame.Surface((32, 24))
-    thumb.fill(NES_PALETTE[theme["sky"]])  # Sky color
+    # Sky
+    for i in range(10):
+        level_data.append(bytearray(b" " * 100))
+        
+    # Platforms
+    for i in range(10, 15):
+        level_data.append(bytearray(b" " * 100))
+        
+    # Ground
+    for i in range(15, 20):
+        if i == 15:
+            row = bytearray(b"G" * 100)
+        else:
+            row = bytearray(b"B" * 100)
+        level_data.append(row)
     
-    # Draw a simple representation of the level
-    for y, row in enumerate(level_data[10:14]):
-        for x, char in enumerate(row[::3]):  # Sample every 3rd column
-            if char in ("G", "B", "P", "T"):
-                thumb.set_at((x, y+10), NES_PALETTE[theme["ground"]])  # Ground color
-            elif char in ("?", "B"):
-                thumb.set_at((x, y+10), NES_PALETTE[theme["block"]])  # Block color
+    # Add platforms
+    for i in range(5 + level):  # More platforms in later levels
+        platform_y = rng.randint(8, 12)
+        platform_x = rng.randint(10 + i*20, 15 + i*20)
+        length = rng.randint(4, 8)
+        for j in range(length):
+            put_tile(level_data[platform_y], platform_x+j, "P")
     
-    THUMBNAILS[level_id] = thumb
+    # Add pipes
+    for i in range(2 + level//2):  # More pipes in later levels
+        pipe_x = rng.randint(20 + i*30, 25 + i*30)
+        pipe_height = rng.randint(2, 4)
+        for j in range(pipe_height):
+            put_tile(level_data[19-j], pipe_x, "T")
+            put_tile(level_data[19-j], pipe_x+1, "T")
+    
+    # Add bricks and question blocks
+    for i in range(8 + level):  # More blocks in later levels
+        block_y = rng.randint(5, 10)
+        block_x = rng.randint(5 + i*10, 8 + i*10)
+        block_type = "?" if rng.random() > 0.5 else "B"
+        put_tile(level_data[block_y], block_x, block_type)
+    
+    # Add player start
+    put_tile(level_data[14], 5, "S")
+    
+    # Add flag at end
+    put_tile(level_data[14], 95, "F")
+    
+    # Add enemies
+    for i in range(5 + level):  # More enemies in later levels
+        enemy_y = 14
+        enemy_x = rng.randint(20 + i*15, 25 + i*15)
+        enemy_type = theme["enemy"]
+        put_tile(level_data[enemy_y], enemy_x, enemy_type)
+    
+    return [bytes(row) for row in level_data]
+
+class LevelProvider:
+    # Levels by id, generated the first time one is asked for and cached on
+    # disk, so starting the game doesn't build all 32
+    def __init__(self):
+        self.levels = {}
+        
+    def __getitem__(self, level_id):
+        level = self.levels.get(level_id)
+        if level is None:
+            if level_id not in LEVEL_IDS:
+                raise KeyError(level_id)
+            level = self.load(level_id)
+            if level is None:
+                level = generate_level(level_id)
+                self.save(level_id, level)
+            self.levels[level_id] = level
+        return level
+    
+    def cache_path(self, level_id):
+        # Any change to the generator, its seed or the themes' enemies yields a new file
+        signature = repr((LEVEL_SEED, [theme["enemy"] for theme in WORLD_THEMES.values()],
+                          code_signature(generate_level.__code__),
+                          code_signature(put_tile.__code__)))
+        digest = hashlib.sha1(signature.encode()).hexdigest()[:16]
+        return os.path.join(CACHE_DIR, f"level_{level_id}_{digest}.lvl")
+    
+    def load(self, level_id):
+        # Rows joined by newlines and zlib-compressed
+        try:
+            with open(self.cache_path(level_id), "rb") as f:
+                return zlib.decompress(f.read()).split(b"\n")
+        except (OSError, zlib.error):
+            return None
+    
+    def save(self, level_id, level):
+        path = self.cache_path(level_id)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(zlib.compress(b"\n".join(level)))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass  # The cache is only an optimisation
+
+LEVELS = LevelProvider()
+
+# Level thumbnails
+THUMB_SIZE = (32, 24)
+
+class ThumbnailAtlas:
+    # Thumbnails by level id. Each is drawn the first time it's shown, into its
+    # slot of one surface shared by all 32, and cached on disk by the levels
+    def __init__(self):
+        self.atlas = None
+        self.thumbs = {}
+        
+    def __getitem__(self, level_id):
+        thumb = self.thumbs.get(level_id)
+        if thumb is None:
+            if level_id not in LEVEL_IDS:
+                raise KeyError(level_id)
+            if self.atlas is None:
+                self.atlas = pygame.Surface((THUMB_SIZE[0] * len(LEVEL_IDS), THUMB_SIZE[1]))
+            slot = LEVEL_IDS.index(level_id)
+            thumb = self.atlas.subsurface((slot * THUMB_SIZE[0], 0) + THUMB_SIZE)
+            pixels = self.load(level_id)
+            if pixels is None:
+                pixels = self.draw(level_id)
+                self.save(level_id, pixels)
+            pygame.surfarray.blit_array(thumb, pixels)
+            self.thumbs[level_id] = thumb
+        return thumb
+    
+    def draw(self, level_id):
+        world = int(level_id.split("-")[0])
+        theme = WORLD_THEMES[world]
+        
+        pixels = np.empty(THUMB_SIZE + (3,), np.uint8)
+        pixels[:] = NES_PALETTE[theme["sky"]]  # Sky color
+        
+        # Draw a simple representation of the level: rows 10-13, sampling
+        # every 3rd column, indexed (x, y) like surfarray
+        tiles = np.array([np.frombuffer(row[::3][:THUMB_SIZE[0]], np.uint8)
+                          for row in LEVELS[level_id][10:14]]).T
+        band = pixels[:len(tiles), 10:14]
+        band[np.isin(tiles, list(b"GBPT"))] = NES_PALETTE[theme["ground"]]  # Ground color
+        band[tiles == ord("?")] = NES_PALETTE[theme["block"]]  # Block color
+        return pixels
+    
+    def cache_path(self, level_id):
+        # Follows the level's own cache file, plus the drawing code and colors
+        signature = repr((os.path.basename(LEVELS.cache_path(level_id)), THUMB_SIZE,
+                          WORLD_THEMES[int(level_id.split("-")[0])], NES_PALETTE,
+                          code_signature(ThumbnailAtlas.draw.__code__)))
+        digest = hashlib.sha1(signature.encode()).hexdigest()[:16]
+        return os.path.join(CACHE_DIR, f"thumb_{level_id}_{digest}.rgbz")
+    
+    def load(self, level_id):
+        try:
+            with open(self.cache_path(level_id), "rb") as f:
+                data = zlib.decompress(f.read())
+            return np.frombuffer(data, np.uint8).reshape(THUMB_SIZE + (3,))
+        except (OSError, ValueError, zlib.error):
+            return None
+    
+    def save(self, level_id, pixels):
+        path = self.cache_path(level_id)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(zlib.compress(pixels.tobytes()))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass  # The cache is only an optimisation
+
+THUMBNAILS = ThumbnailAtlas()
 
 # Entity classes
 class Entity:
@@ -171,14 +332,17 @@ class Entity:
         self.on_ground = False
         self.facing_right = True
         self.active = True
+        self.rect = pygame.Rect(x, y, self.width, self.height)
         
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        # Reuse one rect per entity rather than allocating a new one per query
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
         
     def check_collision(self, other):
         return self.get_rect().colliderect(other.get_rect())
         
-    def update(self, colliders, dt):
+    def update(self, tilemap, dt):
         # Apply gravity
         if not self.on_ground:
             self.vy += 0.5 * dt * 60
@@ -187,9 +351,12 @@ class Entity:
         self.x += self.vx * dt * 60
         self.y += self.vy * dt * 60
         
-        # Check collision with ground
+        # Check collision with the solid tiles around the entity. A push out of
+        # one tile moves it less than a tile, so one tile of margin covers
+        # everything it can touch on the way
         self.on_ground = False
-        for rect in colliders:
+        nearby = self.get_rect().inflate(TILE * 2, TILE * 2)
+        for rect in tilemap.solids_overlapping(nearby):
             if self.get_rect().colliderect(rect):
                 # Bottom collision
                 if self.vy > 0 and self.y + self.height > rect.top and self.y < rect.top:
@@ -221,7 +388,7 @@ class Player(Entity):
         self.animation_frame = 0
         self.walk_timer = 0
         
-    def update(self, colliders, dt, enemies):
+    def update(self, tilemap, dt, enemies):
         # Handle input
         keys = pygame.key.get_pressed()
         
@@ -252,7 +419,7 @@ class Player(Entity):
         if self.invincible > 0:
             self.invincible -= dt
             
-        super().update(colliders, dt)
+        super().update(tilemap, dt)
         
         # Check collision with enemies
         for enemy in enemies:
@@ -330,23 +497,17 @@ class Goomba(Entity):
         self.animation_frame = 0
         self.walk_timer = 0
         
-    def update(self, colliders, dt):
+    def update(self, tilemap, dt):
         # Turn around at edges
         if self.on_ground:
             # Check for edge
-            edge_check = pygame.Rect(self.x + (self.width if self.vx > 0 else -1), 
-                                    self.y + self.height, 
-                                    1, 1)
-            edge_found = False
-            for rect in colliders:
-                if edge_check.colliderect(rect):
-                    edge_found = True
-                    break
+            edge_found = tilemap.ground_at(self.x + (self.width if self.vx > 0 else -1),
+                                           self.y + self.height)
                     
             if not edge_found:
                 self.vx *= -1
                 
-        super().update(colliders, dt)
+        super().update(tilemap, dt)
         
         # Update animation
         self.walk_timer += dt
@@ -403,12 +564,12 @@ class Fish(Entity):
         self.swim_timer = 0
         self.in_water = True
         
-    def update(self, colliders, dt):
+    def update(self, tilemap, dt):
         # Move in sine wave pattern
         self.swim_timer += dt
         self.y += math.sin(self.swim_timer * 5) * 0.5
         
-        super().update(colliders, dt)
+        super().update(tilemap, dt)
         
     def draw(self, surf, cam):
         if not self.active:
@@ -446,25 +607,89 @@ class Spike(Entity):
             (x + TILE, y + TILE)
         ])
 
+# Map columns baked into each chunk surface
+CHUNK_TILES = 16
+CHUNK_WIDTH = CHUNK_TILES * TILE
+# Transparent colorkey for baked chunks; not an NES palette color
+CHUNK_KEY = (255, 0, 255)
+# Tile codes entities collide with, as a translate table mapping each to 1
+SOLID_TILES = bytes(1 if chr(code) in "GBPT?" else 0 for code in range(256))
+
 class TileMap:
     def __init__(self, level_data, level_id):
-        self.tiles = []
-        self.colliders = []
+        # Generated rows can run past the first one's length; pad them all to
+        # the longest so the grid is rectangular. The camera still stops at
+        # the first row's width
+        self.cols = max(len(row) for row in level_data)
+        self.rows = [bytearray(row.ljust(self.cols)) for row in level_data]
         self.width = len(level_data[0]) * TILE
-        self.height = len(level_data) * TILE
+        self.height = len(self.rows) * TILE
         self.level_id = level_id
         world = int(level_id.split("-")[0])
         self.theme = WORLD_THEMES[world]
         
-        # Parse level data
-        for y, row in enumerate(level_data):
-            for x, char in enumerate(row):
+        # Solid tiles as one flat grid, a byte per tile, so collision only
+        # looks at the tiles around an entity
+        self.solid = bytearray(b"".join(row.translate(SOLID_TILES) for row in self.rows))
+        
+        # Bake the tiles into column chunks, so a frame blits two or three
+        # surfaces instead of drawing every tile
+        self.chunks = [self.bake_chunk(i) for i in range(-(-self.cols // CHUNK_TILES))]
+    
+    def solid_at(self, tx, ty):
+        if 0 <= tx < self.cols and 0 <= ty < len(self.rows):
+            return self.solid[ty * self.cols + tx] == 1
+        return False
+    
+    def ground_at(self, x, y):
+        # Is the pixel at (x, y) inside a solid tile
+        return self.solid_at(int(x) // TILE, int(y) // TILE)
+    
+    def solids_overlapping(self, rect):
+        # Rects of the solid tiles rect overlaps, in row-major order
+        left = max(0, rect.left // TILE)
+        right = min(self.cols - 1, (rect.right - 1) // TILE)
+        top = max(0, rect.top // TILE)
+        bottom = min(len(self.rows) - 1, (rect.bottom - 1) // TILE)
+        for ty in range(top, bottom + 1):
+            base = ty * self.cols
+            for tx in range(left, right + 1):
+                if self.solid[base + tx]:
+                    yield pygame.Rect(tx * TILE, ty * TILE, TILE, TILE)
+    
+    def bake_chunk(self, index):
+        chunk = pygame.Surface((CHUNK_WIDTH, self.height)).convert()
+        chunk.fill(CHUNK_KEY)
+        chunk.set_colorkey(CHUNK_KEY, RLEACCEL)
+        first = index * CHUNK_TILES
+        for y, row in enumerate(self.rows):
+            for x in range(first, min(first + CHUNK_TILES, self.cols)):
+                char = chr(row[x])
                 if char != " ":
-                    rect = pygame.Rect(x * TILE, y * TILE, TILE, TILE)
-                    self.tiles.append((x * TILE, y * TILE, char))
-                    
-                    if char in ("G", "B", "P", "T", "?"):
-                        self.colliders.append(rect)
+                    self.draw_tile(chunk, (x - first) * TILE, y * TILE, char)
+        return chunk
+    
+    def draw_tile(self, surf, draw_x, y, char):
+        if char == "G":  # Green ground top
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]], (draw_x, y, TILE, TILE))
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]-1], (draw_x, y+8, TILE, TILE-8))
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]-2], (draw_x+4, y+4, TILE-8, 4))
+        elif char == "B":  # Brown block
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["block"]], (draw_x, y, TILE, TILE))
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["block"]-1], (draw_x+2, y+2, TILE-4, TILE-4))
+        elif char == "P":  # Platform
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]], (draw_x, y, TILE, TILE))
+        elif char == "T":  # Pipe
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["pipe"]], (draw_x, y, TILE, TILE))
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["pipe"]-1], (draw_x+2, y+2, TILE-4, TILE-4))
+        elif char == "?":  # Question block
+            pygame.draw.rect(surf, NES_PALETTE[self.theme["block"]], (draw_x, y, TILE, TILE))
+            pygame.draw.rect(surf, NES_PALETTE[39], (draw_x+4, y+4, 8, 4))
+            pygame.draw.rect(surf, NES_PALETTE[39], (draw_x+4, y+8, 2, 2))
+            pygame.draw.rect(surf, NES_PALETTE[39], (draw_x+10, y+8, 2, 2))
+        elif char == "F":  # Flag
+            pygame.draw.rect(surf, NES_PALETTE[31], (draw_x+6, y, 4, TILE*4))
+            pygame.draw.rect(surf, NES_PALETTE[33], (draw_x, y, 10, 6))
     
     def draw(self, surf, cam):
         # Draw sky
@@ -477,32 +702,59 @@ class TileMap:
             pygame.draw.ellipse(surf, NES_PALETTE[31], (x, y, 30, 15))
             pygame.draw.ellipse(surf, NES_PALETTE[31], (x+15, y-5, 25, 15))
         
-        # Draw tiles
-        for x, y, char in self.tiles:
-            draw_x = x - cam
-            if draw_x < -TILE or draw_x > WIDTH:
-                continue
-                
-            if char == "G":  # Green ground top
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]], (draw_x, y, TILE, TILE))
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]-1], (draw_x, y+8, TILE, TILE-8))
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]-2], (draw_x+4, y+4, TILE-8, 4))
-            elif char == "B":  # Brown block
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["block"]], (draw_x, y, TILE, TILE))
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["block"]-1], (draw_x+2, y+2, TILE-4, TILE-4))
-            elif char == "P":  # Platform
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["ground"]], (draw_x, y, TILE, TILE))
-            elif char == "T":  # Pipe
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["pipe"]], (draw_x, y, TILE, TILE))
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["pipe"]-1], (draw_x+2, y+2, TILE-4, TILE-4))
-            elif char == "?":  # Question block
-                pygame.draw.rect(surf, NES_PALETTE[self.theme["block"]], (draw_x, y, TILE, TILE))
-                pygame.draw.rect(surf, NES_PALETTE[39], (draw_x+4, y+4, 8, 4))
-                pygame.draw.rect(surf, NES_PALETTE[39], (draw_x+4, y+8, 2, 2))
-                pygame.draw.rect(surf, NES_PALETTE[39], (draw_x+10, y+8, 2, 2))
-            elif char == "F":  # Flag
-                pygame.draw.rect(surf, NES_PALETTE[31], (draw_x+6, y, 4, TILE*4))
-                pygame.draw.rect(surf, NES_PALETTE[33], (draw_x, y, 10, 6))
+        # Draw the chunks overlapping the screen, rounding the camera the way
+        # entities' x - cam truncates so tiles and sprites stay aligned
+        offset = math.ceil(cam)
+        first = max(0, offset // CHUNK_WIDTH)
+        last = min(len(self.chunks) - 1, (offset + WIDTH) // CHUNK_WIDTH)
+        for i in range(first, last + 1):
+            surf.blit(self.chunks[i], (i * CHUNK_WIDTH - offset, 0))
+
+# Text comes from the Koopa engine's font registry and rendered-text cache,
+# shared with the other Koopa variants
+def render_text(text, size, color):
+    return engine.render_font_text(text, None, size, color)
+
+class HudBar:
+    # The level's top bar, composited once and redrawn only when a value on
+    # it changes, which for the timer is once a second
+    def __init__(self):
+        self.surface = pygame.Surface((WIDTH, 20)).convert()
+        self.values = None
+        
+    def draw(self, s, level_id, time):
+        values = (state.score, state.coins, level_id, int(time), state.lives)
+        if values != self.values:
+            self.values = values
+            self.compose(*values)
+        s.blit(self.surface, (0, 0))
+        
+    def compose(self, score, coins, level_id, time, lives):
+        bar = self.surface
+        bar.fill(NES_PALETTE[0])
+        
+        # Score
+        score_text = render_text(f"SCORE {score:06d}", 16, NES_PALETTE[39])
+        bar.blit(score_text, (10, 4))
+        
+        # Coins
+        coin_text = render_text(f"COINS {coins:02d}", 16, NES_PALETTE[39])
+        bar.blit(coin_text, (WIDTH//2 - coin_text.get_width()//2, 4))
+        
+        # World
+        world_text = render_text(f"WORLD {level_id}", 16, NES_PALETTE[39])
+        bar.blit(world_text, (WIDTH - world_text.get_width() - 10, 4))
+        
+        # Time
+        time_text = render_text(f"TIME {time:03d}", 16, NES_PALETTE[39])
+        bar.blit(time_text, (WIDTH//2 - time_text.get_width()//2, 4))
+        
+        # Lives
+        lives_text = render_text(f"x{lives}", 16, NES_PALETTE[39])
+        bar.blit(lives_text, (WIDTH - 60, 4))
+        # Draw small mario for lives indicator
+        pygame.draw.rect(bar, NES_PALETTE[33], (WIDTH - 80, 6, 8, 8))
+        pygame.draw.rect(bar, NES_PALETTE[39], (WIDTH - 80, 2, 8, 8))
 
 # Scenes
 class TitleScreen(Scene):
@@ -515,7 +767,7 @@ class TitleScreen(Scene):
     def handle(self, events, keys):
         for e in events:
             if e.type == KEYDOWN and e.key == K_RETURN:
-                push(FileSelect())
+                push(from_pool(FileSelect))
                 
     def update(self, dt):
         self.timer += dt
@@ -541,17 +793,14 @@ class TitleScreen(Scene):
         pygame.draw.rect(surf, NES_PALETTE[33], (box_x, box_y, box_width, box_height))
         
         # Title inside box
-        title_font = pygame.font.SysFont(None, 32)
-        title = title_font.render("KOOPA ENGINE 1.0A", True, NES_PALETTE[39])
+        title = render_text("KOOPA ENGINE 1.0A", 32, NES_PALETTE[39])
         surf.blit(title, (box_x + (box_width - title.get_width()) // 2, box_y + 15))
         
-        subtitle_font = pygame.font.SysFont(None, 16)
-        subtitle = subtitle_font.render("8 Worlds Edition", True, NES_PALETTE[21])
+        subtitle = render_text("8 Worlds Edition", 16, NES_PALETTE[21])
         surf.blit(subtitle, (box_x + (box_width - subtitle.get_width()) // 2, box_y + 50))
         
         # Copyright
-        copyright_font = pygame.font.SysFont(None, 14)
-        copyright = copyright_font.render("[C] Team Flames 20XX [1985] - Nintendo", True, NES_PALETTE[0])
+        copyright = render_text("[C] Team Flames 20XX [1985] - Nintendo", 14, NES_PALETTE[0])
         surf.blit(copyright, (WIDTH//2 - copyright.get_width()//2, box_y + box_height + 20))
         
         # Mario and enemies
@@ -584,12 +833,16 @@ class TitleScreen(Scene):
         
         # Press Start
         if self.logo_y >= self.logo_target_y and int(self.timer * 10) % 2 == 0:
-            font = pygame.font.SysFont(None, 24)
-            text = font.render("PRESS ENTER", True, NES_PALETTE[39])
+            text = render_text("PRESS ENTER", 24, NES_PALETTE[39])
             surf.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT - 30))
 
 class FileSelect(Scene):
+    pooled = True
+    
     def __init__(self):
+        self.enter()
+        
+    def enter(self):
         self.offset = 0
         self.selected = 0
         
@@ -601,9 +854,9 @@ class FileSelect(Scene):
                 elif e.key == K_RETURN:
                     state.slot = self.selected
                     state.world = state.progress[state.slot]["world"]
-                    push(WorldMapScene())
+                    push(from_pool(WorldMapScene))
                 elif e.key == K_ESCAPE:
-                    push(TitleScreen())
+                    pop_to(TitleScreen)
                     
     def update(self, dt):
         self.offset += dt
@@ -612,8 +865,7 @@ class FileSelect(Scene):
         s.fill(NES_PALETTE[27])
         
         # Title
-        font = pygame.font.SysFont(None, 30)
-        title = font.render("SELECT PLAYER", True, NES_PALETTE[33])
+        title = render_text("SELECT PLAYER", 30, NES_PALETTE[33])
         s.blit(title, (WIDTH//2 - title.get_width()//2, 20))
         
         # Draw file slots
@@ -626,8 +878,7 @@ class FileSelect(Scene):
             pygame.draw.rect(s, NES_PALETTE[33], (x, y, 40, 60))
             
             # Slot number
-            slot_font = pygame.font.SysFont(None, 20)
-            slot_text = slot_font.render(f"{i+1}", True, NES_PALETTE[39])
+            slot_text = render_text(f"{i+1}", 20, NES_PALETTE[39])
             s.blit(slot_text, (x+18, y+5))
             
             # Selection indicator
@@ -637,16 +888,20 @@ class FileSelect(Scene):
             # World preview
             if state.progress[i]:
                 world = state.progress[i]["world"]
-                world_font = pygame.font.SysFont(None, 16)
-                world_text = world_font.render(f"WORLD {world}", True, NES_PALETTE[39])
+                world_text = render_text(f"WORLD {world}", 16, NES_PALETTE[39])
                 s.blit(world_text, (x+20 - world_text.get_width()//2, y+50))
                 
                 # Draw thumbnail
-                thumb = THUMBNAILS.get(f"{world}-1", THUMBNAILS["1-1"])
+                thumb = THUMBNAILS[f"{world}-1"]
                 s.blit(thumb, (x+4, y+20))
 
 class WorldMapScene(Scene):
+    pooled = True
+    
     def __init__(self):
+        self.enter()
+        
+    def enter(self):
         self.selection = state.world
         self.offset = 0
         self.cursor_pos = (0, 0)
@@ -669,7 +924,7 @@ class WorldMapScene(Scene):
                         state.progress[state.slot]["world"] = self.selection
                         push(LevelScene(f"{state.world}-1"))
                 elif e.key == K_ESCAPE:
-                    push(FileSelect())
+                    pop_to(FileSelect)
                     
     def update(self, dt):
         self.offset += dt
@@ -679,8 +934,7 @@ class WorldMapScene(Scene):
         s.fill(NES_PALETTE[27])
         
         # Title
-        font = pygame.font.SysFont(None, 30)
-        title = font.render("WORLD MAP", True, NES_PALETTE[33])
+        title = render_text("WORLD MAP", 30, NES_PALETTE[33])
         s.blit(title, (WIDTH//2 - title.get_width()//2, 20))
         
         # Draw world grid
@@ -704,15 +958,13 @@ class WorldMapScene(Scene):
                 pygame.draw.line(s, NES_PALETTE[33], (x+world_size, y), (x, y+world_size), 3)
             
             # Draw world number
-            world_font = pygame.font.SysFont(None, 20)
-            world_text = world_font.render(f"{world}", True, NES_PALETTE[39])
+            world_text = render_text(f"{world}", 20, NES_PALETTE[39])
             s.blit(world_text, (x + world_size//2 - world_text.get_width()//2, 
                                y + world_size//2 - world_text.get_height()//2))
             
             # Draw world name if selected
             if world == self.selection:
-                name_font = pygame.font.SysFont(None, 14)
-                name_text = name_font.render(theme["name"], True, NES_PALETTE[39])
+                name_text = render_text(theme["name"], 14, NES_PALETTE[39])
                 s.blit(name_text, (WIDTH//2 - name_text.get_width()//2, HEIGHT - 40))
                 
         # Draw cursor on selected world
@@ -733,14 +985,18 @@ class WorldMapScene(Scene):
         pygame.draw.rect(s, NES_PALETTE[39], (mario_x+4, mario_y, 8, 8))
         
         # Draw instructions
-        font = pygame.font.SysFont(None, 14)
-        text = font.render("Arrow keys: Move  Enter: Select  Esc: Back", True, NES_PALETTE[39])
+        text = render_text("Arrow keys: Move  Enter: Select  Esc: Back", 14, NES_PALETTE[39])
         s.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT - 20))
         
         # Draw unlocked worlds indicator
-        unlocked_text = font.render(f"Unlocked Worlds: {max(state.unlocked_worlds)}/8", True, NES_PALETTE[39])
+        unlocked_text = render_text(f"Unlocked Worlds: {max(state.unlocked_worlds)}/8", 14, NES_PALETTE[39])
         s.blit(unlocked_text, (10, HEIGHT - 20))
 
+# Enemies wake when their column comes within ACTIVATION_MARGIN of the screen,
+# and are parked again once they are PARK_MARGIN outside it
+ACTIVATION_MARGIN = 2 * TILE
+PARK_MARGIN = 6 * TILE
+
 class LevelScene(Scene):
     def __init__(self, level_id):
         self.map = TileMap(LEVELS[level_id], level_id)
@@ -753,12 +1009,13 @@ class LevelScene(Scene):
         self.end_level = False
         self.end_timer = 0
         self.mushrooms = []
+        self.hud = HudBar()
         world = int(level_id.split("-")[0])
         self.theme = WORLD_THEMES[world]
         
         # Parse level for enemies and player start
         for y, row in enumerate(LEVELS[level_id]):
-            for x, char in enumerate(row):
+            for x, char in enumerate(row.decode("ascii")):
                 if char == "S":
                     self.player.x = x * TILE
                     self.player.y = y * TILE
@@ -776,28 +1033,63 @@ class LevelScene(Scene):
                         self.enemies.append(Spike(x * TILE, y * TILE))
                     else:
                         self.enemies.append(Goomba(x * TILE, y * TILE))
+        
+        # Enemies sleep in a bucket per map column until the camera comes near,
+        # so only those around the screen are updated and drawn
+        self.dormant = [[] for _ in range(self.map.cols)]
+        for enemy in self.enemies:
+            self.park(enemy)
+        self.enemies = []
+        self.activate_enemies()
+    
+    def park(self, enemy):
+        col = min(max(int(enemy.x) // TILE, 0), self.map.cols - 1)
+        self.dormant[col].append(enemy)
+        
+    def activate_enemies(self):
+        # Wake the buckets near the screen
+        cam = int(self.cam)
+        first = max(0, (cam - ACTIVATION_MARGIN) // TILE)
+        last = min(self.map.cols - 1, (cam + WIDTH + ACTIVATION_MARGIN) // TILE)
+        for col in range(first, last + 1):
+            if self.dormant[col]:
+                self.enemies.extend(self.dormant[col])
+                self.dormant[col].clear()
+                
+        # Park enemies that have drifted well off screen. Defeated ones and
+        # ones that fell out of the level are dropped for good
+        nearby = []
+        for enemy in self.enemies:
+            if enemy.y > self.map.height:
+                continue
+            if cam - PARK_MARGIN <= enemy.x <= cam + WIDTH + PARK_MARGIN:
+                nearby.append(enemy)
+            elif enemy.active:
+                self.park(enemy)
+        self.enemies = nearby
     
     def handle(self, evts, keys):
         for e in evts:
             if e.type == KEYDOWN and e.key == K_ESCAPE:
-                push(WorldMapScene())
+                pop_to(WorldMapScene)
                 
     def update(self, dt):
         # Update time
         self.time -= dt
         
         # Update player
-        self.player.update(self.map.colliders, dt, self.enemies)
+        self.player.update(self.map, dt, self.enemies)
         
         # Update enemies
         for enemy in self.enemies:
             if enemy.active:
-                enemy.update(self.map.colliders, dt)
+                enemy.update(self.map, dt)
         
         # Camera follow player
         target = self.player.x - WIDTH // 2
         self.cam += (target - self.cam) * 0.1
         self.cam = max(0, min(self.cam, self.map.width - WIDTH))
+        self.activate_enemies()
         
         # Check for end of level
         if self.player.x > self.map.width - 100 and not self.end_level:
@@ -814,14 +1106,14 @@ class LevelScene(Scene):
                 
                 if level < 4:
                     next_level = f"{world}-{level+1}"
-                    push(LevelScene(next_level))
+                    replace(LevelScene(next_level))
                 else:
                     # World completed
                     if world < 8 and (world + 1) not in state.unlocked_worlds:
                         state.unlocked_worlds.append(world + 1)
                     
                     # Return to world map
-                    push(WorldMapScene())
+                    pop_to(WorldMapScene)
         
     def draw(self, s):
         # Draw map
@@ -835,34 +1127,10 @@ class LevelScene(Scene):
         self.player.draw(s, self.cam)
         
         # Draw HUD
-        pygame.draw.rect(s, NES_PALETTE[0], (0, 0, WIDTH, 20))
-        
-        # Score
-        font = pygame.font.SysFont(None, 16)
-        score_text = font.render(f"SCORE {state.score:06d}", True, NES_PALETTE[39])
-        s.blit(score_text, (10, 4))
-        
-        # Coins
-        coin_text = font.render(f"COINS {state.coins:02d}", True, NES_PALETTE[39])
-        s.blit(coin_text, (WIDTH//2 - coin_text.get_width()//2, 4))
-        
-        # World
-        world_text = font.render(f"WORLD {self.level_id}", True, NES_PALETTE[39])
-        s.blit(world_text, (WIDTH - world_text.get_width() - 10, 4))
-        
-        # Time
-        time_text = font.render(f"TIME {int(self.time):03d}", True, NES_PALETTE[39])
-        s.blit(time_text, (WIDTH//2 - time_text.get_width()//2, 4))
-        
-        # Lives
-        lives_text = font.render(f"x{state.lives}", True, NES_PALETTE[39])
-        s.blit(lives_text, (WIDTH - 60, 4))
-        # Draw small mario for lives indicator
-        pygame.draw.rect(s, NES_PALETTE[33], (WIDTH - 80, 6, 8, 8))
-        pygame.draw.rect(s, NES_PALETTE[39], (WIDTH - 80, 2, 8, 8))
+        self.hud.draw(s, self.level_id, self.time)
         
         # Draw world theme name
-        theme_text = font.render(self.theme["name"], True, NES_PALETTE[39])
+        theme_text = render_text(self.theme["name"], 16, NES_PALETTE[39])
         s.blit(theme_text, (WIDTH//2 - theme_text.get_width()//2, HEIGHT - 20))
 
 class GameOverScene(Scene):
@@ -872,18 +1140,16 @@ class GameOverScene(Scene):
     def update(self, dt):
         self.timer -= dt
         if self.timer <= 0:
-            pop()  # Back to file select
+            pop_to(FileSelect)  # Back to file select
             state.lives = 3
             state.score = 0
             
     def draw(self, s):
         s.fill(NES_PALETTE[0])
-        font = pygame.font.SysFont(None, 40)
-        text = font.render("GAME OVER", True, NES_PALETTE[33])
+        text = render_text("GAME OVER", 40, NES_PALETTE[33])
         s.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT//2 - 20))
         
-        font = pygame.font.SysFont(None, 20)
-        text = font.render(f"FINAL SCORE: {state.score}", True, NES_PALETTE[39])
+        text = render_text(f"FINAL SCORE: {state.score}", 20, NES_PALETTE[39])
         s.blit(text, (WIDTH//2 - text.get_width()//2, HEIGHT//2 + 20))
 
 class WinScreen(Scene):
@@ -932,7 +1198,7 @@ class WinScreen(Scene):
                     fw["particles"].remove(p)
                     
         if self.timer <= 0:
-            push(TitleScreen())
+            reset_to(TitleScreen())
             
     def draw(self, s):
         s.fill(NES_PALETTE[0])
@@ -946,16 +1212,13 @@ class WinScreen(Scene):
                 pygame.draw.circle(s, color, (int(p["x"]), int(p["y"])), 2)
         
         # Text
-        font = pygame.font.SysFont(None, 40)
-        text = font.render("CONGRATULATIONS!", True, NES_PALETTE[33])
+        text = render_text("CONGRATULATIONS!", 40, NES_PALETTE[33])
         s.blit(text, (WIDTH//2 - text.get_width()//2, 50))
         
-        font = pygame.font.SysFont(None, 30)
-        text = font.render("YOU SAVED THE PRINCESS!", True, NES_PALETTE[39])
+        text = render_text("YOU SAVED THE PRINCESS!", 30, NES_PALETTE[39])
         s.blit(text, (WIDTH//2 - text.get_width()//2, 100))
         
-        font = pygame.font.SysFont(None, 24)
-        text = font.render(f"FINAL SCORE: {state.score}", True, NES_PALETTE[31])
+        text = render_text(f"FINAL SCORE: {state.score}", 24, NES_PALETTE[31])
         s.blit(text, (WIDTH//2 - text.get_width()//2, 150))
 
 # Main game
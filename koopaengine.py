@@ -0,0 +1,3142 @@
+import pygame
+import argparse
+import bisect
+import csv
+import hashlib
+import json
+import math
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# Nothing is initialized at import; the window opens on the first init_display(),
+# after a variant has had its say through configure()
+WIDTH, HEIGHT = 800, 500
+CAPTION = "Paper Mario: Thousand-Year Door Engine"
+screen = None
+
+def init_display(headless=False):
+    global screen
+    if screen is None:
+        if headless:
+            # SDL's dummy drivers must be picked before the display starts
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        pygame.display.init()
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption(CAPTION)
+    return screen
+
+# Pre-rendered atlases and resolved font files are kept here between runs
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".koopa_cache")
+
+# Colors
+BACKGROUND = (100, 160, 255)
+GROUND_COLOR = (136, 84, 50)
+GREEN = (60, 160, 55)
+RED = (222, 55, 55)
+YELLOW = (255, 220, 70)
+BLUE = (70, 150, 255)
+BROWN = (139, 69, 19)
+LIGHT_BROWN = (180, 140, 80)
+WHITE = (255, 255, 255)
+BLACK = (20, 20, 20)
+KOOPA_GREEN = (60, 150, 60)
+KOOPA_SHELL = (130, 190, 70)
+KOOPA_DARK = (40, 110, 40)
+BANDANA_BLUE = (40, 110, 220)
+PURPLE = (160, 80, 210)
+ORANGE = (255, 145, 30)
+PAPER_YELLOW = (250, 240, 180)
+SHADOW = (0, 0, 0, 100)
+MENU_BG = (80, 140, 220)
+MENU_HIGHLIGHT = (120, 180, 255)
+LAYER_KEY = (255, 0, 255)  # Transparent colorkey for pre-rendered layers
+
+# Colors a variant may restyle through configure()
+PALETTE = ["BACKGROUND", "GROUND_COLOR", "GREEN", "RED", "YELLOW", "BLUE", "BROWN",
+           "LIGHT_BROWN", "WHITE", "BLACK", "KOOPA_GREEN", "KOOPA_SHELL", "KOOPA_DARK",
+           "BANDANA_BLUE", "PURPLE", "ORANGE", "PAPER_YELLOW", "MENU_BG", "MENU_HIGHLIGHT"]
+
+# Koops' size and handling, likewise replaceable per variant
+KOOPS_TUNING = {
+    "width": 40,
+    "height": 50,
+    "crouch_height": 35,
+    "walking_speed": 4,
+    "running_speed": 6,
+    "jump_power": 14,
+    "gravity": 0.7
+}
+
+# Fixed simulation rate; every per-step constant (gravity, speeds, timers) assumes it
+SIM_HZ = 60
+SIM_DT = 1.0 / SIM_HZ
+# Longest real frame fed to the simulation, so a stall can't snowball
+MAX_FRAME_TIME = 0.25
+# Rendering runs as fast as the display allows, up to this cap
+MAX_FPS = 240
+
+GAME_STATES = {
+    "MENU": 0,
+    "BOOT": 1,
+    "GAMEPLAY": 2,
+    "GAME_OVER": 3,
+    "TITLE": 4
+}
+
+# Seed for the grass tufts, so the same stage always draws the same ground
+GROUND_SEED = 1
+
+# Stroke definitions on a 30x30 design grid, one polyline per stroke
+GLYPH_STROKES = {
+    'A': [
+        [(0, 30), (15, 0)],
+        [(15, 0), (30, 30)],
+        [(5, 20), (25, 20)],
+    ],
+    'B': [
+        [(0, 0), (0, 30)],
+        [(0, 0), (20, 0), (25, 5), (25, 10), (20, 15), (0, 15)],
+        [(0, 15), (20, 15), (25, 20), (25, 25), (20, 30), (0, 30)],
+    ],
+    'C': [[(25, 0), (5, 0), (0, 5), (0, 25), (5, 30), (25, 30)]],
+    'D': [
+        [(0, 0), (0, 30)],
+        [(0, 0), (20, 0), (30, 10), (30, 20), (20, 30), (0, 30)],
+    ],
+    'E': [
+        [(0, 0), (0, 30)],
+        [(0, 0), (25, 0)],
+        [(0, 15), (20, 15)],
+        [(0, 30), (25, 30)],
+    ],
+    'F': [
+        [(0, 0), (0, 30)],
+        [(0, 0), (25, 0)],
+        [(0, 15), (20, 15)],
+    ],
+    'G': [
+        [(25, 0), (5, 0), (0, 5), (0, 25), (5, 30), (25, 30), (30, 25)],
+        [(30, 25), (20, 25), (20, 15)],
+    ],
+    'H': [
+        [(0, 0), (0, 30)],
+        [(30, 0), (30, 30)],
+        [(0, 15), (30, 15)],
+    ],
+    'I': [
+        [(0, 0), (30, 0)],
+        [(15, 0), (15, 30)],
+        [(0, 30), (30, 30)],
+    ],
+    'J': [
+        [(15, 0), (30, 0)],
+        [(30, 0), (30, 20), (25, 30), (15, 30), (10, 25), (10, 20)],
+    ],
+    'K': [
+        [(0, 0), (0, 30)],
+        [(0, 15), (30, 0)],
+        [(0, 15), (30, 30)],
+    ],
+    'L': [
+        [(0, 0), (0, 30)],
+        [(0, 30), (25, 30)],
+    ],
+    'M': [[(0, 30), (0, 0), (15, 15), (30, 0), (30, 30)]],
+    'N': [[(0, 30), (0, 0), (30, 30), (30, 0)]],
+    'O': [[(0, 0), (0, 30), (30, 30), (30, 0), (0, 0)]],
+    'P': [
+        [(0, 0), (0, 30)],
+        [(0, 0), (20, 0), (30, 10), (30, 15), (20, 30), (0, 30)],
+    ],
+    'Q': [
+        [(0, 0), (0, 30), (30, 30), (30, 0), (0, 0)],
+        [(15, 15), (30, 30)],
+    ],
+    'R': [
+        [(0, 0), (0, 30)],
+        [(0, 0), (20, 0), (30, 10), (30, 15), (20, 30), (0, 30)],
+        [(15, 15), (30, 30)],
+    ],
+    'S': [[(25, 0), (5, 0), (0, 5), (0, 15), (5, 15), (25, 15), (30, 20), (30, 25), (25, 30), (5, 30)]],
+    'T': [
+        [(0, 0), (30, 0)],
+        [(15, 0), (15, 30)],
+    ],
+    'U': [[(0, 0), (0, 25), (5, 30), (25, 30), (30, 25), (30, 0)]],
+    'V': [[(0, 0), (15, 30), (30, 0)]],
+    'W': [[(0, 0), (0, 30), (15, 15), (30, 30), (30, 0)]],
+    'X': [
+        [(0, 0), (30, 30)],
+        [(30, 0), (0, 30)],
+    ],
+    'Y': [
+        [(0, 0), (15, 15), (30, 0)],
+        [(15, 15), (15, 30)],
+    ],
+    'Z': [
+        [(0, 0), (30, 0)],
+        [(30, 0), (0, 30)],
+        [(0, 30), (30, 30)],
+    ],
+    ' ': [],
+    '!': [
+        [(15, 0), (15, 20)],
+        [(15, 25), (15, 30)],
+    ],
+    '?': [
+        [(5, 0), (25, 0), (30, 5), (30, 15), (20, 25), (15, 25)],
+        [(15, 30), (15, 30)],
+    ],
+    '/': [[(30, 0), (0, 30)]],
+    ':': [
+        [(15, 10), (15, 10)],
+        [(15, 20), (15, 20)],
+    ],
+    '.': [[(15, 25), (15, 25)]],
+    ',': [[(15, 25), (10, 30)]],
+    "'": [[(15, 0), (15, 10)]],
+    '"': [
+        [(10, 0), (10, 10)],
+        [(20, 0), (20, 10)],
+    ],
+    '(': [[(20, 0), (10, 15), (20, 30)]],
+    ')': [[(10, 0), (20, 15), (10, 30)]],
+    '[': [
+        [(20, 0), (10, 0)],
+        [(10, 0), (10, 30)],
+        [(10, 30), (20, 30)],
+    ],
+    ']': [
+        [(10, 0), (20, 0)],
+        [(20, 0), (20, 30)],
+        [(20, 30), (10, 30)],
+    ],
+    '-': [[(5, 15), (25, 15)]],
+}
+
+# Drawn for any character missing from GLYPH_STROKES
+FALLBACK_STROKES = [
+    [(0, 0), (30, 0)],
+    [(30, 0), (30, 30)],
+    [(30, 30), (0, 30)],
+    [(0, 30), (0, 0)],
+]
+
+def compile_glyph(strokes):
+    # Flatten each polyline into an (x0, y0, x1, y1, ...) tuple
+    return tuple(tuple(coord for point in line for coord in point) for line in strokes)
+
+# Compiled once at import: char -> tuple of flat stroke arrays
+GLYPHS = {char: compile_glyph(strokes) for char, strokes in GLYPH_STROKES.items()}
+FALLBACK_GLYPH = compile_glyph(FALLBACK_STROKES)
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+def pack_arrays(arrays, count):
+    # The first count entries of each array, back to back
+    return b"".join(array[:count].tobytes() for array in arrays)
+
+def unpack_arrays(data, offset, arrays, count):
+    # Inverse of pack_arrays; returns the offset just past the arrays
+    for array in arrays:
+        array[:count] = np.frombuffer(data, array.dtype, count, offset)
+        offset += array.itemsize * count
+    return offset
+
+# Mersenne Twister state words plus the cached gauss() value
+RANDOM_STATE = struct.Struct("<625I?d")
+
+def pack_random_state(rng):
+    version, internal, gauss = rng.getstate()
+    return RANDOM_STATE.pack(*internal, gauss is not None, gauss or 0.0)
+
+def unpack_random_state(rng, data, offset):
+    values = RANDOM_STATE.unpack_from(data, offset)
+    rng.setstate((3, values[:625], values[626] if values[625] else None))
+    return offset + RANDOM_STATE.size
+
+# One period of sine, for the animation lookups; a power of two so the
+# phase wraps with a mask
+SINE_TABLE_SIZE = 1024
+SINE_TABLE = [math.sin(2 * math.pi * i / SINE_TABLE_SIZE) for i in range(SINE_TABLE_SIZE)]
+
+class FrameClock:
+    # Simulation time, advanced once per step and shared by every entity
+    # updated in it, so they all animate off the same instant
+    def __init__(self, ticks=0.0):
+        self.ticks = ticks  # milliseconds
+        self.phases = {}
+        
+    def advance(self, seconds):
+        self.ticks += seconds * 1000
+        self.phases.clear()
+        
+    def phase(self, rate):
+        # Table index of ticks * rate radians; each rate is worked out once per step
+        index = self.phases.get(rate)
+        if index is None:
+            index = int(self.ticks * rate * (SINE_TABLE_SIZE / (2 * math.pi)))
+            self.phases[rate] = index
+        return index
+        
+    def sin(self, rate):
+        return SINE_TABLE[self.phase(rate) & (SINE_TABLE_SIZE - 1)]
+        
+    def cos(self, rate):
+        return SINE_TABLE[(self.phase(rate) + SINE_TABLE_SIZE // 4) & (SINE_TABLE_SIZE - 1)]
+
+class VectorFont:
+    # Finished text surfaces, least recently used first
+    TEXT_CACHE_SIZE = 256
+    text_cache = OrderedDict()
+
+    @staticmethod
+    def render_text(surface, text, x, y, size, color, outline_color=None, outline=2):
+        if not text:
+            return
+        pad = VectorFont.padding(outline)
+        text_surface = VectorFont.render(text, size, color, outline_color, outline)
+        surface.blit(text_surface, (x - pad, y - pad))
+
+    @staticmethod
+    def padding(outline):
+        # Room for the outline stroke around the 30x30 design grid
+        return outline + 2
+
+    @staticmethod
+    def render(text, size, color, outline_color=None, outline=2):
+        # The outline follows the palette unless given
+        if outline_color is None:
+            outline_color = BLACK
+        key = (text, size, tuple(color), tuple(outline_color), outline)
+        cache = VectorFont.text_cache
+        text_surface = cache.get(key)
+        if text_surface is not None:
+            cache.move_to_end(key)
+            return text_surface
+
+        char_width = size * 0.6
+        spacing = size * 0.1
+        pad = VectorFont.padding(outline)
+        width = math.ceil((len(text) - 1) * (char_width + spacing) + size) + pad * 2
+        height = math.ceil(size) + pad * 2
+        text_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        for i, char in enumerate(text):
+            char_x = pad + i * (char_width + spacing)
+            VectorFont.draw_char(text_surface, char, char_x, pad, size, color, outline_color, outline)
+
+        cache[key] = text_surface
+        if len(cache) > VectorFont.TEXT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return text_surface
+
+    @staticmethod
+    def draw_char(surface, char, x, y, size, color, outline_color, outline):
+        scale = size / 30
+
+        for stroke in GLYPHS.get(char, FALLBACK_GLYPH):
+            scaled_line = [(x + stroke[i] * scale, y + stroke[i + 1] * scale)
+                           for i in range(0, len(stroke), 2)]
+
+            # Draw outline
+            pygame.draw.lines(surface, outline_color, False, scaled_line, outline + 2)
+
+            # Draw main line
+            pygame.draw.lines(surface, color, False, scaled_line, outline)
+
+# Font files system font names resolved to, kept between runs because pygame's
+# lookup scans every installed font (through fc-list on Linux) on first use
+FONT_FILES_PATH = os.path.join(CACHE_DIR, "font_files.json")
+font_files = None
+
+def find_font_file(name, bold):
+    # (path, fake_bold) for a system font name; path is None for the default font
+    global font_files
+    if font_files is None:
+        try:
+            with open(FONT_FILES_PATH) as f:
+                font_files = json.load(f)
+        except (OSError, ValueError):
+            font_files = {}
+
+    key = f"{name.lower()}:{int(bold)}"
+    entry = font_files.get(key)
+    if entry is None or (entry[0] and not os.path.exists(entry[0])):
+        path = pygame.font.match_font(name, bold=bold)
+        # No bold face of its own means pygame has to embolden the regular one
+        fake_bold = bold and path is not None and path == pygame.font.match_font(name)
+        entry = font_files[key] = [path, fake_bold]
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(FONT_FILES_PATH + ".tmp", "w") as f:
+                json.dump(font_files, f)
+            os.replace(FONT_FILES_PATH + ".tmp", FONT_FILES_PATH)
+        except OSError:
+            pass  # The cache is only an optimisation
+    return entry
+
+# Loaded fonts by (name, size, bold); the font module starts on first use
+fonts = {}
+
+def get_font(name, size, bold=False):
+    # Stands in for pygame.font.SysFont, which looks the name up again every call
+    key = (name, size, bold)
+    font = fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        path, fake_bold = find_font_file(name, bold) if name else (None, bold)
+        font = pygame.font.Font(path, size)
+        if fake_bold or (bold and path is None):
+            font.set_bold(True)
+        fonts[key] = font
+    return font
+
+# Rendered font text, least recently used first
+FONT_TEXT_CACHE_SIZE = 128
+font_text_cache = OrderedDict()
+
+def render_font_text(text, name, size, color, bold=False):
+    key = (text, name, size, tuple(color), bold)
+    text_surface = font_text_cache.get(key)
+    if text_surface is not None:
+        font_text_cache.move_to_end(key)
+        return text_surface
+
+    text_surface = get_font(name, size, bold).render(text, True, color)
+    font_text_cache[key] = text_surface
+    if len(font_text_cache) > FONT_TEXT_CACHE_SIZE:
+        font_text_cache.popitem(last=False)
+    return text_surface
+
+# Koops' leg, head and bandana sines (periods 2pi, 2pi/3, 2pi/2.5) all repeat every 4pi
+ANIMATION_LOOP = 4 * math.pi
+
+# Animation phases baked per loop. Each step moves the fastest sine, the
+# bandana's, by 2.5 * 4pi / POSE_PHASES radians: at 64 that is under 1.5px of
+# its 3px swing, where fewer phases make it jump and the head bob alias.
+# Lower it through configure(pose_phases=...) to save memory
+POSE_PHASES = 64
+
+# The invincibility flash poses (small pupils, hurt mouth) only show for a
+# second after a hit, so they are baked at this many phases instead; that
+# keeps them to 3/7 of the sheet rather than 3/4
+FLASH_PHASES = 16
+
+# Facing, blink and crouch: the poses baked at every phase
+STEADY_POSES = 8
+
+# Atlas frame box relative to Koops' (x, y)
+POSE_LEFT, POSE_TOP = -24, -60
+POSE_WIDTH, POSE_HEIGHT = 56, 118
+ATLAS_COLUMNS = 32
+
+def draw_koops_pose(surface, x, y, width, height, direction, leg_offset, head_bob,
+                    bandana_offset, eye_open, pupil_size, hurt):
+    # Draw shadow
+    pygame.draw.ellipse(surface, SHADOW, 
+        (x - 10, y + height - 5, 40, 10))
+    
+    # Draw shell (with shell design)
+    shell_rect = (x - 15, y - 25, width, 25)
+    pygame.draw.ellipse(surface, KOOPA_SHELL, shell_rect)
+    pygame.draw.ellipse(surface, BLACK, shell_rect, 2)
+    
+    # Shell pattern
+    nubs = [
+        (x, y - 10), 
+        (x - 10, y - 5),
+        (x + 10, y - 5),
+        (x, y)
+    ]
+    for pos in nubs:
+        pygame.draw.circle(surface, (150, 175, 60), pos, 4)
+        pygame.draw.circle(surface, BLACK, pos, 4, 1)
+    
+    # Draw head
+    head_y = y - 40 + head_bob
+    head_x = x
+    
+    # Draw bandana (with flowing effect)
+    bandana_points = [
+        (head_x - 20, head_y - bandana_offset - 5),
+        (head_x - 15, head_y - bandana_offset - 8),
+        (head_x + 15, head_y - bandana_offset - 8),
+        (head_x + 20, head_y - bandana_offset - 5)
+    ]
+    pygame.draw.polygon(surface, BANDANA_BLUE, bandana_points)
+    pygame.draw.polygon(surface, BLACK, bandana_points, 2)
+    
+    # Bandana knot
+    pygame.draw.circle(surface, (30, 80, 200), 
+                      (head_x, head_y - bandana_offset - 8), 4)
+    
+    # Head shape
+    head_rect = (head_x - 15, head_y, 30, 18)
+    pygame.draw.ellipse(surface, KOOPA_GREEN, head_rect)
+    pygame.draw.ellipse(surface, KOOPA_DARK, head_rect, 2)
+    
+    # Eyes
+    eye_x = head_x - 5 if direction == -1 else head_x + 5
+    eye_x += direction  # Slight offset
+    
+    eye_height = 10 if eye_open else 2
+    pygame.draw.ellipse(surface, WHITE, 
+                       (eye_x - 5, head_y + 5, 10, eye_height))
+    if eye_open:
+        pygame.draw.circle(surface, BLACK, 
+                          (eye_x, head_y + 8), pupil_size)
+    
+    # Mouth (changes expression when hurt)
+    if hurt:
+        # Hurt expression
+        pygame.draw.arc(surface, (120, 40, 40), 
+                       (head_x - 12, head_y - 1, 24, 12), 
+                       math.pi, 2 * math.pi, 2)
+    else:
+        # Normal expression
+        pygame.draw.arc(surface, KOOPA_DARK, 
+                       (head_x - 8, head_y + 5, 16, 10), 
+                       0, math.pi, 2)
+    
+    # Legs with walking effect
+    for i, side in enumerate([-1, 1]):
+        leg_x = x + side * 7
+        leg_y = y - 15 + leg_offset * (1 if i == 0 else -1)
+        pygame.draw.ellipse(surface, KOOPA_DARK, 
+                          (leg_x - 5, leg_y, 10, 12))
+
+def draw_hit_points(surface, x, y, hit_points):
+    for i in range(3):
+        fill = i < hit_points
+        # Draw heart using vectors
+        hp_x = x + i * 15
+        hp_y = y
+        
+        # Heart shape (two circles + triangle)
+        pygame.draw.circle(surface, RED if fill else (120, 120, 120), 
+                          (hp_x - 3, hp_y - 2), 4)
+        pygame.draw.circle(surface, RED if fill else (120, 120, 120), 
+                          (hp_x + 3, hp_y - 2), 4)
+        pygame.draw.polygon(surface, RED if fill else (120, 120, 120), [
+            (hp_x - 5, hp_y - 1),
+            (hp_x + 5, hp_y - 1),
+            (hp_x, hp_y + 5)
+        ])
+        
+        # Outline
+        pygame.draw.line(surface, BLACK, (hp_x - 3, hp_y - 2), (hp_x - 5, hp_y - 1), 1)
+        pygame.draw.line(surface, BLACK, (hp_x - 3, hp_y - 2), (hp_x, hp_y + 5), 1)
+        pygame.draw.line(surface, BLACK, (hp_x + 3, hp_y - 2), (hp_x + 5, hp_y - 1), 1)
+        pygame.draw.line(surface, BLACK, (hp_x + 3, hp_y - 2), (hp_x, hp_y + 5), 1)
+
+class KoopsAtlas:
+    # Every quantized pose of Koops on one colorkeyed sheet: the steady poses
+    # at every phase, then the three flash combinations at FLASH_PHASES
+    def __init__(self, phases=None):
+        self.phases = POSE_PHASES if phases is None else phases
+        self.flash_phases = min(FLASH_PHASES, self.phases)
+        self.count = (self.phases + self.flash_phases * 3) * STEADY_POSES
+        rows = math.ceil(self.count / ATLAS_COLUMNS)
+        self.sheet_size = (ATLAS_COLUMNS * POSE_WIDTH, rows * POSE_HEIGHT)
+        
+        self.sheet = self.load()
+        if self.sheet is None:
+            self.sheet = self.render()
+            self.save()
+        self.sheet.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+        
+        self.frames = [self.sheet.subsurface(self.frame_rect(index))
+                       for index in range(self.count)]
+        
+        # Health meter, one sprite per hit point count
+        self.hearts = []
+        for hit_points in range(4):
+            hearts = pygame.Surface((46, 16)).convert()
+            hearts.fill(LAYER_KEY)
+            hearts.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+            draw_hit_points(hearts, 8, 8, hit_points)
+            self.hearts.append(hearts)
+    
+    def index(self, phase, direction, eye_open, crouching, pupil_small, hurt):
+        # phase runs over self.phases; flash poses take the nearest flash phase
+        steady = ((direction == 1) * 2 + eye_open) * 2 + crouching
+        flash = pupil_small * 2 + hurt
+        if flash:
+            phase = round(phase * self.flash_phases / self.phases) % self.flash_phases
+        return self.slot(phase, steady, flash)
+    
+    def slot(self, phase, steady, flash):
+        # Steady poses fill the first self.phases rows of eight, flash poses follow
+        row = self.phases + phase * 3 + flash - 1 if flash else phase
+        return row * STEADY_POSES + steady
+    
+    def frame_rect(self, index):
+        column, row = index % ATLAS_COLUMNS, index // ATLAS_COLUMNS
+        return (column * POSE_WIDTH, row * POSE_HEIGHT, POSE_WIDTH, POSE_HEIGHT)
+    
+    def render(self):
+        sheet = pygame.Surface(self.sheet_size).convert()
+        sheet.fill(LAYER_KEY)
+        for flash, phases in ((0, self.phases), (1, self.flash_phases),
+                              (2, self.flash_phases), (3, self.flash_phases)):
+            pupil_small, hurt = flash >= 2, flash % 2 == 1
+            for phase in range(phases):
+                time = phase * ANIMATION_LOOP / phases
+                for direction in (-1, 1):
+                    for eye_open in (False, True):
+                        for crouching in (False, True):
+                            steady = ((direction == 1) * 2 + eye_open) * 2 + crouching
+                            frame_rect = self.frame_rect(self.slot(phase, steady, flash))
+                            sheet.set_clip(frame_rect)
+                            draw_koops_pose(sheet,
+                                            frame_rect[0] - POSE_LEFT, frame_rect[1] - POSE_TOP,
+                                            KOOPS_TUNING["width"],
+                                            KOOPS_TUNING["crouch_height" if crouching else "height"],
+                                            direction,
+                                            math.sin(time) * 4,
+                                            math.sin(time * 3) * 1,
+                                            math.sin(time * 2.5) * 3,
+                                            eye_open, 4 if pupil_small else 5, hurt)
+        sheet.set_clip(None)
+        return sheet
+    
+    def cache_path(self):
+        # Any change to the pose drawing code, palette or Koops' size yields a new file
+        code = draw_koops_pose.__code__
+        signature = repr((self.phases, self.flash_phases, POSE_LEFT, POSE_TOP, POSE_WIDTH, POSE_HEIGHT,
+                          ATLAS_COLUMNS, LAYER_KEY, SHADOW, KOOPA_SHELL, KOOPA_GREEN,
+                          KOOPA_DARK, BANDANA_BLUE, BLACK, WHITE,
+                          KOOPS_TUNING["width"], KOOPS_TUNING["height"],
+                          KOOPS_TUNING["crouch_height"],
+                          code.co_code, code.co_consts))
+        digest = hashlib.sha1(signature.encode()).hexdigest()[:16]
+        return os.path.join(CACHE_DIR, f"koops_atlas_{self.phases}_{digest}.rgbz")
+    
+    def load(self):
+        try:
+            with open(self.cache_path(), "rb") as f:
+                data = zlib.decompress(f.read())
+            # frombuffer wraps the bytes rather than copying them
+            return pygame.image.frombuffer(data, self.sheet_size, "RGB").convert()
+        except (OSError, ValueError, zlib.error):
+            return None
+    
+    def save(self):
+        path = self.cache_path()
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                f.write(zlib.compress(pygame.image.tobytes(self.sheet, "RGB")))
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass  # The cache is only an optimisation
+    
+    def frame(self, koops):
+        phase = round((koops.anim_time % ANIMATION_LOOP) / ANIMATION_LOOP * self.phases) % self.phases
+        return self.frames[self.index(
+            phase,
+            koops.direction,
+            koops.closing_eyes < 4,
+            koops.crouching,
+            koops.invincible % 6 >= 3,
+            koops.invincible > 0 and koops.invincible % 10 > 4
+        )]
+
+koops_atlas = None
+
+def draw_koops(surface, koops, x, y):
+    atlas = get_koops_atlas()
+    surface.blit(atlas.frame(koops), (x + POSE_LEFT, y + POSE_TOP))
+    
+    # Draw hit points (as health meter)
+    surface.blit(atlas.hearts[max(0, min(3, koops.hit_points))], (x - 8, y - 63))
+
+def get_koops_atlas():
+    global koops_atlas
+    if koops_atlas is None:
+        koops_atlas = KoopsAtlas()
+    return koops_atlas
+
+# How far below a platform's top Koops' feet may start a step and still land on it
+LANDING_BAND = 20
+
+class Koops:
+    def __init__(self, x, y, rng=random, world_width=WIDTH):
+        self.x = x
+        self.y = y
+        self.width = KOOPS_TUNING["width"]
+        self.standing_height = KOOPS_TUNING["height"]
+        self.crouch_height = KOOPS_TUNING["crouch_height"]
+        self.height = self.standing_height
+        self.walking_speed = KOOPS_TUNING["walking_speed"]
+        self.running_speed = KOOPS_TUNING["running_speed"]
+        self.speed = self.walking_speed
+        self.jump_power = KOOPS_TUNING["jump_power"]
+        self.velocity_y = 0
+        self.gravity = KOOPS_TUNING["gravity"]
+        self.direction = 1  # 1 for right, -1 for left
+        self.leg_offset = 0
+        self.head_bob = 0
+        self.bandana_offset = 0
+        self.anim_time = 0
+        self.is_jumping = False
+        self.is_grounded = False
+        self.crouching = False
+        self.running = False
+        self.hit_points = 3
+        self.invincible = 0
+        self.closing_eyes = 0
+        self.velocity_x = 0  # This step's, set by move()
+        self.prev_x = x
+        self.prev_y = y
+        self.rng = rng
+        self.world_width = world_width
+        
+    def update(self, clock, platform_grid, ground_level):
+        # Update animation parameters
+        self.anim_time = clock.ticks * 0.01
+        self.leg_offset = clock.sin(0.01) * 4
+        self.head_bob = clock.sin(0.03) * 1
+        self.bandana_offset = clock.sin(0.025) * 3
+        
+        # Apply gravity
+        self.velocity_y += self.gravity
+        
+        # Apply invincibility timer
+        if self.invincible > 0:
+            self.invincible -= 1
+        
+        # Check eye blink
+        if self.closing_eyes > 0:
+            self.closing_eyes -= 1
+        elif self.rng.random() < 0.005:  # Random blink
+            self.closing_eyes = 7
+        
+        self.is_grounded = False
+        self.sweep(platform_grid, ground_level)
+        
+    def move(self, dx):
+        # Pick this step's horizontal velocity; update() sweeps it together
+        # with the fall
+        self.velocity_x = 0
+        if self.crouching:
+            return
+            
+        # Determine speed (walk or run)
+        self.speed = self.running_speed if self.running else self.walking_speed
+        self.velocity_x = dx * self.speed
+            
+        # Update direction
+        if dx > 0:
+            self.direction = 1
+        elif dx < 0:
+            self.direction = -1
+    
+    def sweep(self, platform_grid, ground_level):
+        # Move along the step's whole motion vector to the earliest contact,
+        # resolve it, then carry on along the surface hit with what is left,
+        # so no speed in any direction can skip past a platform or its corner
+        move_x = self.velocity_x
+        move_y = self.velocity_y
+        
+        # Keep to the ends of the stage
+        target_x = min(max(self.x + move_x, 0), self.world_width - self.width)
+        move_x = target_x - self.x
+        
+        for _ in range(3):
+            if move_x == 0 and move_y == 0:
+                break
+            contact = self.first_contact(move_x, move_y, platform_grid, ground_level)
+            if contact is None:
+                self.x += move_x
+                self.y += move_y
+                break
+            t, landing, stop = contact
+            if landing:
+                self.x += move_x * t
+                self.y = stop
+                self.velocity_y = 0
+                self.is_grounded = True
+                self.is_jumping = False
+                move_x *= 1 - t
+                move_y = 0
+            else:
+                self.x = stop
+                self.y += move_y * t
+                move_x = 0
+                move_y *= 1 - t
+        
+        # Never end a step below the ground
+        if self.y + self.height > ground_level:
+            self.y = ground_level - self.height
+            self.velocity_y = 0
+            self.is_grounded = True
+            self.is_jumping = False
+    
+    def first_contact(self, move_x, move_y, platform_grid, ground_level):
+        # Earliest (time, landing, stop) along (move_x, move_y), time running
+        # 0-1 over the move; stop is the y to land at or the x to halt at
+        x, y, width, height = self.x, self.y, self.width, self.height
+        bottom = y + height
+        best = None
+        
+        if move_y > 0 and bottom + move_y >= ground_level:
+            best = (max(0.0, (ground_level - bottom) / move_y), True, ground_level - height)
+        
+        left = min(x, x + move_x)
+        top = min(y, y + move_y)
+        for platform in platform_grid.query(left, top, width + abs(move_x), height + abs(move_y)):
+            # Feet crossing the top; feet starting just under it land too
+            if move_y > 0:
+                if bottom <= platform.y:
+                    t = (platform.y - bottom) / move_y
+                elif bottom < platform.y + LANDING_BAND:
+                    t = 0.0
+                else:
+                    t = None
+                if t is not None and t <= 1:
+                    at_x = x + move_x * t
+                    if (at_x + width > platform.x and at_x < platform.x + platform.width and
+                            (best is None or t <= best[0])):
+                        best = (t, True, platform.y - height)
+            
+            # Sides, as walls; starting inside one pushes out the way of travel
+            if move_x != 0:
+                if move_x > 0:
+                    stop = platform.x - width
+                    if x + width <= platform.x:
+                        t = (platform.x - x - width) / move_x
+                    elif x < platform.x + platform.width:
+                        t = 0.0
+                    else:
+                        t = None
+                else:
+                    stop = platform.x + platform.width
+                    if x >= platform.x + platform.width:
+                        t = (platform.x + platform.width - x) / move_x
+                    elif x + width > platform.x:
+                        t = 0.0
+                    else:
+                        t = None
+                if t is not None and t <= 1:
+                    at_y = y + move_y * t
+                    # Landings win ties, so a corner is stood on, not snagged
+                    if (at_y + height > platform.y and at_y < platform.y + platform.height and
+                            (best is None or t < best[0])):
+                        best = (t, False, stop)
+        return best
+                    
+    def rect(self):
+        return (self.x, self.y, self.width, self.height)
+            
+    def jump(self):
+        if self.is_grounded and not self.is_jumping:
+            self.velocity_y = -self.jump_power
+            self.is_jumping = True
+            self.is_grounded = False
+            
+    def crouch(self, crouch):
+        self.crouching = crouch
+        if crouch:
+            self.height = self.crouch_height
+        else:
+            self.height = self.standing_height
+            
+    def run(self, run):
+        self.running = run
+    
+    def damage(self):
+        if self.invincible == 0:
+            self.hit_points -= 1
+            self.invincible = 30
+            
+    def save_previous(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
+    # Everything update() and move() carry from one step to the next
+    STATE = struct.Struct("<10d b 4i 4?")
+    
+    def save_state(self):
+        return Koops.STATE.pack(
+            self.x, self.y, self.prev_x, self.prev_y, self.velocity_y, self.speed,
+            self.anim_time, self.leg_offset, self.head_bob, self.bandana_offset,
+            self.direction, self.height, self.hit_points, self.invincible, self.closing_eyes,
+            self.is_jumping, self.is_grounded, self.crouching, self.running)
+        
+    def load_state(self, data, offset):
+        (self.x, self.y, self.prev_x, self.prev_y, self.velocity_y, self.speed,
+         self.anim_time, self.leg_offset, self.head_bob, self.bandana_offset,
+         self.direction, self.height, self.hit_points, self.invincible, self.closing_eyes,
+         self.is_jumping, self.is_grounded, self.crouching, self.running) = Koops.STATE.unpack_from(data, offset)
+        return offset + Koops.STATE.size
+            
+    def draw(self, surface, camera_offset, alpha=1.0):
+        # Interpolate between the last two simulation steps
+        x = lerp(self.prev_x, self.x, alpha) - camera_offset
+        y = lerp(self.prev_y, self.y, alpha)
+        
+        KOOPS_ART(surface, self, x, y)
+
+def swarm_field(name):
+    # Goomba attribute kept in its GoombaSwarm's array of the same name,
+    # or on the Goomba itself until a swarm adopts it
+    local = "_" + name
+    
+    def get(self):
+        if self.swarm is None:
+            return getattr(self, local)
+        return getattr(self.swarm, name)[self.index].item()
+    
+    def set(self, value):
+        if self.swarm is None:
+            setattr(self, local, value)
+        else:
+            getattr(self.swarm, name)[self.index] = value
+    
+    return property(get, set)
+
+class Goomba:
+    x = swarm_field("x")
+    y = swarm_field("y")
+    prev_x = swarm_field("prev_x")
+    prev_y = swarm_field("prev_y")
+    direction = swarm_field("direction")
+    crushed = swarm_field("crushed")
+    
+    def __init__(self, x, y, ground_level, walk_range=100):
+        self.swarm = None
+        self.index = 0
+        self.x = x
+        self.y = y
+        self.width = 30
+        self.height = 20
+        self.speed = 1.5
+        self.direction = -1
+        self.walk_range = walk_range
+        self.start_x = x
+        self.prev_x = x
+        self.prev_y = y
+        self.ground_level = ground_level
+        self.squish = 0
+        self.crushed = False
+        
+    @property
+    def animation_offset(self):
+        return 0 if self.swarm is None else self.swarm.animation_offset
+        
+    def bounds(self):
+        # Everywhere the patrol can take it, shadow included
+        reach = self.walk_range + self.speed
+        return (self.start_x - reach - 10, self.start_x + reach + self.width)
+                
+    def draw(self, surface, camera_offset, alpha=1.0):
+        # Interpolate between the last two simulation steps
+        x = lerp(self.prev_x, self.x, alpha) - camera_offset
+        y = lerp(self.prev_y, self.y, alpha)
+        
+        if self.crushed:
+            # Draw squished Goomba
+            pygame.draw.ellipse(surface, BROWN,
+                               (x, y + 5, 
+                                self.width, 8))
+            pygame.draw.ellipse(surface, BLACK, 
+                               (x, y + 5, 
+                                self.width, 8), 1)
+            return
+        
+        # Draw shadow
+        pygame.draw.ellipse(surface, SHADOW, 
+                          (x - 10, y + self.height - 3, 
+                           30, 8))
+        
+        # Draw body
+        body_rect = (x, y + self.animation_offset, 
+                    self.width, self.height - (self.squish * 10))
+        pygame.draw.ellipse(surface, BROWN, body_rect)
+        pygame.draw.ellipse(surface, BLACK, body_rect, 1)
+        
+        # Feet
+        pygame.draw.ellipse(surface, BLACK, 
+                          (x + 5, y + self.height - 5, 
+                           6, 5))
+        pygame.draw.ellipse(surface, BLACK, 
+                          (x + 19, y + self.height - 5, 
+                           6, 5))
+        
+        # Eyes
+        eye_offset = 0
+        eye_pos = [
+            (x + 8 + eye_offset, y + 7),
+            (x + 22 + eye_offset, y + 7)
+        ]
+        for pos in eye_pos:
+            pygame.draw.circle(surface, WHITE, pos, 4)
+            pygame.draw.circle(surface, BLACK, pos, 2)
+            
+        # Eyebrows (give expression)
+        pygame.draw.line(surface, BLACK, 
+                        (x + 6, y + 4),
+                        (x + 10, y + 2), 2)
+        pygame.draw.line(surface, BLACK, 
+                        (x + 24, y + 4),
+                        (x + 20, y + 2), 2)
+
+class GoombaSwarm:
+    # Patrol state of a set of Goombas as parallel arrays, so every walker is
+    # moved and tested against Koops in a handful of NumPy operations
+    def __init__(self, goombas):
+        self.goombas = goombas
+        self.x = np.array([goomba.x for goomba in goombas], dtype=np.float64)
+        self.y = np.array([goomba.y for goomba in goombas], dtype=np.float64)
+        self.prev_x = np.array([goomba.prev_x for goomba in goombas], dtype=np.float64)
+        self.prev_y = np.array([goomba.prev_y for goomba in goombas], dtype=np.float64)
+        self.direction = np.array([goomba.direction for goomba in goombas], dtype=np.int64)
+        self.crushed = np.array([goomba.crushed for goomba in goombas], dtype=bool)
+        self.start_x = np.array([goomba.start_x for goomba in goombas], dtype=np.float64)
+        self.walk_range = np.array([goomba.walk_range for goomba in goombas], dtype=np.float64)
+        self.speed = np.array([goomba.speed for goomba in goombas], dtype=np.float64)
+        self.width = np.array([goomba.width for goomba in goombas], dtype=np.float64)
+        self.height = np.array([goomba.height for goomba in goombas], dtype=np.float64)
+        self.standing_y = np.array([goomba.ground_level - goomba.height for goomba in goombas],
+                                   dtype=np.float64)
+        self.animation_offset = 0
+        
+        # From here on the Goombas read and write through to the arrays
+        for i, goomba in enumerate(goombas):
+            goomba.swarm = self
+            goomba.index = i
+            
+    def __len__(self):
+        return len(self.goombas)
+        
+    def save_previous(self):
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+        
+    # Goomba count and shared animation offset, followed by the moving state
+    STATE = struct.Struct("<Id")
+    
+    def state_arrays(self):
+        return (self.x, self.y, self.prev_x, self.prev_y, self.direction, self.crushed)
+        
+    def save_state(self):
+        count = len(self)
+        return (GoombaSwarm.STATE.pack(count, self.animation_offset) +
+                pack_arrays(self.state_arrays(), count))
+        
+    def load_state(self, data, offset):
+        count, self.animation_offset = GoombaSwarm.STATE.unpack_from(data, offset)
+        if count != len(self):
+            raise ValueError(f"snapshot has {count} Goombas, swarm has {len(self)}")
+        return unpack_arrays(data, offset + GoombaSwarm.STATE.size, self.state_arrays(), count)
+        
+    def update(self, clock):
+        self.animation_offset = clock.sin(0.03) * 2
+        
+        # Walk back and forth
+        walking = ~self.crushed
+        np.add(self.x, self.speed * self.direction, out=self.x, where=walking)
+        turning = walking & (np.abs(self.x - self.start_x) > self.walk_range)
+        np.negative(self.direction, out=self.direction, where=turning)
+        
+        # Set position on ground
+        np.copyto(self.y, self.standing_y, where=walking)
+        
+    def touching(self, x, y, width, height):
+        # Indices of walking Goombas overlapping the box, in swarm order, and
+        # whether the box is coming down on top of each
+        hit = ((x + width > self.x + 5) &
+               (x < self.x + self.width - 5) &
+               (y + height - 5 > self.y) &
+               (y < self.y + self.height) &
+               ~self.crushed)
+        indices = np.flatnonzero(hit)
+        return indices.tolist(), (y + height < self.y[indices] + 10).tolist()
+
+# Pre-rendered platforms shared by every Platform with the same look:
+# (kind, width, height, color) -> (surface, offset_x, offset_y)
+platform_sprites = {}
+
+# Slack around a platform for decorations drawn past its edges
+PLATFORM_MARGIN = 30
+
+# A cloud's fluff sits at fixed offsets, the last ending 165px past its left
+# edge however narrow the cloud is
+CLOUD_FLUFF_REACH = 165
+
+def platform_extent(kind, width):
+    # How far right of its x a platform's art reaches, before the margin
+    return max(width, CLOUD_FLUFF_REACH) if kind == "cloud" else width
+
+def draw_platform(surface, x_pos, y, width, height, color, kind):
+    if kind == "cloud":
+        # Draw fluffy cloud platform
+        cloud_color = (250, 250, 250)
+        
+        base_rect = (x_pos, y, width, 15)
+        pygame.draw.rect(surface, cloud_color, base_rect)
+        pygame.draw.rect(surface, (200, 200, 200), base_rect, 2)
+        
+        # Cloud fluff textures
+        fluffs = [
+            (x_pos + 10, y - 8, 25, 18),
+            (x_pos + 40, y - 5, 35, 22),
+            (x_pos + 90, y - 6, 30, 20),
+            (x_pos + 140, y - 8, 25, 18)
+        ]
+        for fluff in fluffs:
+            pygame.draw.ellipse(surface, cloud_color, fluff)
+            pygame.draw.ellipse(surface, (200, 200, 200), fluff, 1)
+    elif kind == "spike":
+        # Draw spike platform
+        pygame.draw.rect(surface, (140, 140, 140), 
+                       (x_pos, y, width, height))
+        pygame.draw.rect(surface, BLACK, 
+                       (x_pos, y, width, height), 2)
+        
+        # Spikes
+        for i in range(0, width, 15):
+            spike_points = [
+                (x_pos + i, y + height),
+                (x_pos + i + 7, y + height - 12),
+                (x_pos + i + 14, y + height)
+            ]
+            pygame.draw.polygon(surface, (100, 100, 100), spike_points)
+            pygame.draw.polygon(surface, BLACK, spike_points, 1)
+    else:
+        # Regular brick platform
+        pygame.draw.rect(surface, color, 
+                        (x_pos, y, width, height))
+        pygame.draw.rect(surface, (80, 45, 30), 
+                        (x_pos, y, width, height), 2)
+        
+        # Brick patterns
+        for i in range(0, width, 20):
+            for j in range(0, height, 15):
+                pygame.draw.rect(surface, (color[0]-20, color[1]-20, color[2]-20),
+                               (x_pos + i, y + j, 18, 13))
+                
+        # Edge highlights
+        pygame.draw.line(surface, (color[0]+20, color[1]+20, color[2]+20),
+                        (x_pos + width - 1, y),
+                        (x_pos + width - 1, y + height), 2)
+        pygame.draw.line(surface, (color[0]+20, color[1]+20, color[2]+20),
+                        (x_pos, y),
+                        (x_pos + width, y), 2)
+
+def render_platform(kind, width, height, color):
+    margin = PLATFORM_MARGIN
+    canvas = pygame.Surface((platform_extent(kind, width) + margin * 2,
+                             height + margin * 2)).convert()
+    canvas.fill(LAYER_KEY)
+    canvas.set_colorkey(LAYER_KEY)
+    PLATFORM_ART(canvas, margin, margin, width, height, color, kind)
+    
+    # Crop to the pixels actually drawn
+    bounds = canvas.get_bounding_rect()
+    sprite = canvas.subsurface(bounds).copy()
+    sprite.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+    return sprite, bounds.x - margin, bounds.y - margin
+
+class Platform:
+    def __init__(self, x, y, width, height, color=None, is_spike=False, is_cloud=False):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = LIGHT_BROWN if color is None else color
+        self.is_spike = is_spike
+        self.is_cloud = is_cloud
+        self.kind = "cloud" if is_cloud else "spike" if is_spike else "brick"
+        self.sprite = None
+        
+    def bounds(self):
+        # World x-extent the sprite can cover, margin included
+        return (self.x - PLATFORM_MARGIN,
+                self.x + platform_extent(self.kind, self.width) + PLATFORM_MARGIN)
+        
+    def get_sprite(self):
+        if self.sprite is None:
+            key = (self.kind, self.width, self.height, tuple(self.color))
+            if key not in platform_sprites:
+                platform_sprites[key] = render_platform(*key)
+            self.sprite = platform_sprites[key]
+        return self.sprite
+        
+    def draw(self, surface, camera_offset):
+        sprite, offset_x, offset_y = self.get_sprite()
+        x_pos = int(self.x - camera_offset) + offset_x
+        
+        # Skip platforms outside the viewport
+        if x_pos >= surface.get_width() or x_pos + sprite.get_width() <= 0:
+            return
+        
+        surface.blit(sprite, (x_pos, self.y + offset_y))
+
+def draw_coin(surface, coin, coin_x, coin_y):
+    coin_size = 15
+    
+    # Draw shiny base
+    base_color = YELLOW
+    pygame.draw.circle(surface, base_color, (coin_x, coin_y), coin_size)
+    
+    # Draw shine effect based on flash value
+    if coin.flash > 0.5:
+        pygame.draw.ellipse(surface, (255, 255, 200),
+                          (coin_x - coin_size*0.7, coin_y - coin_size*0.5, 
+                           coin_size*1.4, coin_size*1.0))
+    
+    # Draw rotation effect
+    spin_x = coin.spin[0] * coin_size * 0.7
+    spin_y = coin.spin[1] * coin_size * 0.7
+    pygame.draw.line(surface, ORANGE,
+                   (coin_x - spin_x, coin_y - spin_y),
+                   (coin_x + spin_x, coin_y + spin_y), 
+                   3)
+    
+    # Draw outline
+    pygame.draw.circle(surface, (200, 170, 0), (coin_x, coin_y), coin_size, 2)
+
+class Coin:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.collected = False
+        self.animation_offset = 0
+        # Sine and cosine of the spin angle
+        self.spin = (0, 1)
+        self.rotation = 0  # Degrees, for art that turns a sprite
+        self.flash = 0
+        
+    def bounds(self):
+        return (self.x - 16, self.x + 16)
+        
+    def update(self, clock):
+        if self.collected:
+            return
+        self.animation_offset = clock.sin(0.03) * 3
+        # Two degrees of spin per millisecond
+        self.spin = (clock.sin(math.pi / 90), clock.cos(math.pi / 90))
+        # One degree per millisecond
+        self.rotation = int(clock.ticks) % 360
+        self.flash = clock.sin(0.1)
+        
+    def draw(self, surface, camera_offset):
+        if self.collected:
+            return
+        COIN_ART(surface, self, self.x - camera_offset, self.y + self.animation_offset)
+
+class DialogBox:
+    def __init__(self, text, x, y, width, height):
+        self.text = text
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.timer = 0
+        self.typing_index = 0
+        self.open = False
+        
+    STATE = struct.Struct("<2i?")
+    
+    def save_state(self):
+        return DialogBox.STATE.pack(self.timer, self.typing_index, self.open)
+        
+    def load_state(self, data, offset):
+        self.timer, self.typing_index, self.open = DialogBox.STATE.unpack_from(data, offset)
+        return offset + DialogBox.STATE.size
+        
+    def update(self):
+        self.timer += 1
+        if self.typing_index < len(self.text) and self.timer % 3 == 0:
+            self.typing_index += 1
+            
+    def open_box(self):
+        self.open = True
+        self.timer = 0
+        self.typing_index = 0
+        
+    def draw(self, surface):
+        if not self.open:
+            return
+            
+        # Draw main box with paper effect
+        pygame.draw.rect(surface, PAPER_YELLOW, 
+                       (self.x, self.y, self.width, self.height))
+        pygame.draw.rect(surface, BLACK, 
+                       (self.x, self.y, self.width, self.height), 3)
+        
+        # Draw text
+        displayed_text = self.text[:self.typing_index]
+        VectorFont.render_text(surface, displayed_text, 
+                            self.x + 20, self.y + 20, 
+                            22, BLACK)
+        
+        # Draw arrow if text complete
+        if self.typing_index == len(self.text) and self.timer % 20 < 10:
+            arrow_y = self.y + self.height - 18
+            pygame.draw.polygon(surface, BLACK, [
+                (self.x + self.width - 25, arrow_y),
+                (self.x + self.width - 15, arrow_y),
+                (self.x + self.width - 20, arrow_y + 7)
+            ])
+
+# World-space cell size for the collision broadphase
+GRID_CELL = 128
+
+class SpatialGrid:
+    # Uniform grid over world coordinates; objects are filed under every cell their box touches
+    def __init__(self, cell_size=GRID_CELL):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.spans = {}
+        self.order = {}
+        self.next_order = 0
+        
+    def __len__(self):
+        return len(self.spans)
+        
+    def span(self, x, y, width, height):
+        size = self.cell_size
+        return (int(x // size), int(y // size),
+                int((x + width) // size), int((y + height) // size))
+        
+    def insert(self, obj, x, y, width, height):
+        # Insertion order is kept so queries match a linear scan
+        self.order[obj] = self.next_order
+        self.next_order += 1
+        self.link(obj, self.span(x, y, width, height))
+        
+    def link(self, obj, span):
+        self.spans[obj] = span
+        x0, y0, x1, y1 = span
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), []).append(obj)
+                
+    def unlink(self, obj):
+        x0, y0, x1, y1 = self.spans.pop(obj)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells[(cx, cy)]
+                cell.remove(obj)
+                if not cell:
+                    del self.cells[(cx, cy)]
+                    
+    def remove(self, obj):
+        if obj in self.spans:
+            self.unlink(obj)
+            del self.order[obj]
+            
+    def move(self, obj, x, y, width, height):
+        # Only touch the cells when the object crosses a cell boundary
+        span = self.span(x, y, width, height)
+        if span != self.spans[obj]:
+            self.unlink(obj)
+            self.link(obj, span)
+            
+    def query(self, x, y, width, height):
+        x0, y0, x1, y1 = self.span(x, y, width, height)
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return sorted(found, key=self.order.__getitem__)
+        
+    def sweep(self, probe):
+        # Visit objects under probe() in insertion order, exactly like a linear
+        # scan would; probe() is re-read after each visit so callers may move
+        # the probing object while iterating
+        rect = probe()
+        candidates = self.query(*rect)
+        last = -1
+        i = 0
+        while i < len(candidates):
+            obj = candidates[i]
+            i += 1
+            order = self.order.get(obj, -1)
+            if order <= last:
+                continue
+            last = order
+            yield obj
+            new_rect = probe()
+            if new_rect != rect:
+                rect = new_rect
+                candidates = self.query(*rect)
+                i = 0
+
+class SpanIndex:
+    # Objects sorted by the left edge of their bounds(), for viewport lookups
+    def __init__(self, objects):
+        self.objects = objects
+        self.spans = sorted(obj.bounds() + (i,) for i, obj in enumerate(objects))
+        self.lefts = [left for left, right, i in self.spans]
+        self.reach = max((right - left for left, right, i in self.spans), default=0)
+        
+    def overlapping(self, left, right):
+        # Nothing starting further than reach to the left can get past left
+        start = bisect.bisect_left(self.lefts, left - self.reach)
+        end = bisect.bisect_left(self.lefts, right)
+        hits = sorted(i for l, r, i in self.spans[start:end] if r > left)
+        return [self.objects[i] for i in hits]
+
+class StageGrid:
+    # Broadphase for the static things Koops can collide with; Goombas are
+    # tested in bulk by their GoombaSwarm instead
+    def __init__(self):
+        self.platforms = SpatialGrid()
+        self.coins = SpatialGrid()
+        
+    def add(self, platforms, coins):
+        for platform in platforms:
+            self.platforms.insert(platform, platform.x, platform.y, platform.width, platform.height)
+        for coin in coins:
+            if not coin.collected:
+                self.coins.insert(coin, coin.x, coin.y, 0, 0)
+                
+    def remove(self, platforms, coins):
+        for platform in platforms:
+            self.platforms.remove(platform)
+        for coin in coins:
+            self.coins.remove(coin)
+
+# Particle colors, addressed by index from the particle pool
+PARTICLE_COLORS = [YELLOW, BROWN, RED]
+PARTICLE_CAPACITY = 65536
+PARTICLE_GRAVITY = 0.15
+PARTICLE_MAX_RADIUS = 8
+
+class ParticleSystem:
+    # Fixed-capacity pool; live particles are packed into [0, count)
+    def __init__(self, capacity=PARTICLE_CAPACITY, rng=None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+        self.sprites = None
+        
+    def __len__(self):
+        return self.count
+        
+    def clear(self):
+        self.count = 0
+        
+    # Live count, then the PCG64 generator's state, inc, has_uint32 and uinteger
+    STATE = struct.Struct("<I16s16sII")
+    
+    def state_arrays(self):
+        return (self.x, self.y, self.vx, self.vy, self.life, self.color)
+        
+    def save_state(self):
+        rng = self.rng.bit_generator.state
+        return (ParticleSystem.STATE.pack(self.count,
+                                          rng["state"]["state"].to_bytes(16, "little"),
+                                          rng["state"]["inc"].to_bytes(16, "little"),
+                                          rng["has_uint32"], rng["uinteger"]) +
+                pack_arrays(self.state_arrays(), self.count))
+        
+    def load_state(self, data, offset):
+        count, state, inc, has_uint32, uinteger = ParticleSystem.STATE.unpack_from(data, offset)
+        self.rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": int.from_bytes(state, "little"),
+                      "inc": int.from_bytes(inc, "little")},
+            "has_uint32": has_uint32,
+            "uinteger": uinteger
+        }
+        self.count = count
+        return unpack_arrays(data, offset + ParticleSystem.STATE.size, self.state_arrays(), count)
+        
+    def emit(self, x, y, count, vx_range, vy_range, life, color):
+        # Particles beyond capacity are dropped
+        start = self.count
+        end = min(start + count, self.capacity)
+        k = end - start
+        if k <= 0:
+            return
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = self.rng.uniform(vx_range[0], vx_range[1], k)
+        self.vy[start:end] = self.rng.uniform(vy_range[0], vy_range[1], k)
+        self.life[start:end] = life
+        self.color[start:end] = PARTICLE_COLORS.index(color)
+        self.count = end
+        
+    def update(self):
+        n = self.count
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += PARTICLE_GRAVITY
+        self.life[:n] -= 1
+        
+        # Compact the survivors to the front of the pool
+        alive = self.life[:n] > 0
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        m = len(keep)
+        for array in (self.x, self.y, self.vx, self.vy, self.life, self.color):
+            array[:m] = array[keep]
+        self.count = m
+        
+    def get_sprites(self):
+        # One pre-rendered dot per (color, radius), indexed color * stride + radius
+        if self.sprites is None:
+            stride = PARTICLE_MAX_RADIUS + 1
+            self.sprites = np.empty(len(PARTICLE_COLORS) * stride, dtype=object)
+            for color_index, color in enumerate(PARTICLE_COLORS):
+                for radius in range(stride):
+                    dot = pygame.Surface((radius * 2 + 1, radius * 2 + 1)).convert()
+                    dot.fill(LAYER_KEY)
+                    dot.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+                    if radius:
+                        pygame.draw.circle(dot, color, (radius, radius), radius)
+                    self.sprites[color_index * stride + radius] = dot
+        return self.sprites
+        
+    def draw(self, surface, camera_offset, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return
+        radius = np.clip(self.life[:n] // 10, 1, PARTICLE_MAX_RADIUS)
+        
+        # Step back towards the previous simulation step for interpolation
+        back = 1.0 - alpha
+        x = self.x[:n]
+        y = self.y[:n]
+        if back:
+            x = x - self.vx[:n] * back
+            y = y - (self.vy[:n] - PARTICLE_GRAVITY) * back
+        screen_x = (x - camera_offset).astype(np.int32) - radius
+        screen_y = y.astype(np.int32) - radius
+        
+        # Only stamp dots that overlap the surface
+        width, height = surface.get_size()
+        visible = ((screen_x + radius * 2 >= 0) & (screen_x < width) &
+                   (screen_y + radius * 2 >= 0) & (screen_y < height))
+        sprites = self.get_sprites()[(self.color[:n] * (PARTICLE_MAX_RADIUS + 1) + radius)[visible]]
+        positions = np.column_stack((screen_x[visible], screen_y[visible])).tolist()
+        surface.blits(zip(sprites, positions), doreturn=False)
+
+class ParallaxLayer:
+    def __init__(self, surface, factor, y=0):
+        self.surface = surface
+        self.factor = factor
+        self.y = y
+        self.period = surface.get_width()
+
+    def draw(self, surface, camera_offset):
+        # Tile the pre-rendered strip so it wraps around at its period
+        x = -int((camera_offset * self.factor) % self.period)
+        while x < surface.get_width():
+            surface.blit(self.surface, (x, self.y))
+            x += self.period
+
+def make_layer_strip(width, top, bottom):
+    strip = pygame.Surface((width, bottom - top)).convert()
+    strip.fill(LAYER_KEY)
+    strip.set_colorkey(LAYER_KEY, pygame.RLEACCEL)
+    return strip
+
+def build_sky_layer():
+    sky = pygame.Surface((WIDTH, HEIGHT//2)).convert()
+    for i in range(HEIGHT//2):
+        color_val = 140 + int(i/(HEIGHT)*80)
+        pygame.draw.line(sky, (color_val, color_val, 255), 
+                       (0, i), (WIDTH, i))
+    return ParallaxLayer(sky, 0)
+
+def build_mountain_layer():
+    mountain_color = (100, 120, 160)
+    mountains = [
+        (0, HEIGHT//2, WIDTH//4, HEIGHT//3, 30),
+        (WIDTH//5, HEIGHT//2-20, WIDTH//4, HEIGHT//2.5, 50),
+        (WIDTH//1.8, HEIGHT//2, WIDTH//4, HEIGHT//3, 60)
+    ]
+    # Each mountain used to wrap every WIDTH + w pixels on its own
+    period = WIDTH + WIDTH//4
+    top = int(min(y - h for x, y, w, h, offset in mountains)) - 2
+    strip = make_layer_strip(period, top, HEIGHT)
+    
+    for x, y, w, h, offset in mountains:
+        strip_x = (x - w) % period
+        # Draw twice so a mountain straddling the seam wraps cleanly
+        for base_x in (strip_x, strip_x - period):
+            peak = (base_x + w//2, y - h - top)
+            left = (base_x, y - top)
+            right = (base_x + w, y - top)
+            pygame.draw.polygon(strip, mountain_color, [
+                left, peak, right,
+                (base_x + w, HEIGHT - top),
+                (base_x, HEIGHT - top)
+            ])
+            # Mountain outline
+            pygame.draw.line(strip, BLACK, left, peak, 2)
+            pygame.draw.line(strip, BLACK, peak, right, 2)
+    
+    return ParallaxLayer(strip, 0.1, top)
+
+def build_cloud_layer():
+    clouds = [
+        (-150, 50, 100, 40),
+        (0, 80, 120, 35),
+        (200, 40, 90, 30)
+    ]
+    top = min(y for x, y, w, h in clouds) - 2
+    bottom = max(y + h for x, y, w, h in clouds) + 2
+    strip = make_layer_strip(WIDTH, top, bottom)
+    
+    for x, y, w, h in clouds:
+        strip_x = x % WIDTH
+        for base_x in (strip_x, strip_x - WIDTH):
+            pygame.draw.ellipse(strip, (250, 250, 255), (base_x, y - top, w, h))
+            pygame.draw.ellipse(strip, (200, 200, 255), (base_x, y - top, w, h), 2)
+    
+    # Clouds drift with the camera rather than against it
+    return ParallaxLayer(strip, -0.2, top)
+
+# Built on first use, drawn back to front
+background_layers = []
+
+def get_background_layers():
+    if not background_layers:
+        background_layers.extend([
+            build_sky_layer(),
+            build_mountain_layer(),
+            build_cloud_layer()
+        ])
+    return background_layers
+
+def draw_background(surface, camera_offset):
+    for layer in get_background_layers():
+        layer.draw(surface, camera_offset)
+
+def draw_ground_strip(strip, ground_y, rng):
+    period, bottom = strip.get_size()
+    
+    # Draw grass
+    pygame.draw.rect(strip, GROUND_COLOR, 
+                   (0, ground_y, period, bottom - ground_y))
+    
+    # Draw grass top
+    pygame.draw.rect(strip, GREEN, 
+                   (0, ground_y, period, 12))
+    
+    # Draw grass tufts
+    for i in range(0, period, 20):
+        height = rng.randint(0, 5)
+        for j in range(4):
+            line_x = i + j * 4
+            pygame.draw.line(strip, GREEN, 
+                           (line_x, ground_y),
+                           (line_x, ground_y - height - j//2), 1)
+    
+    # Draw ground details
+    for i in range(0, period, 15):
+        pygame.draw.line(strip, (100, 60, 40), 
+                       (i, ground_y + 10), (i, ground_y + 40), 1)
+
+def build_ground_layer(ground_level, seed=GROUND_SEED):
+    # Tufts repeat every 20px and details every 15px, so tile on a multiple of 60
+    period = math.ceil(WIDTH / 60) * 60
+    top = ground_level - 8
+    strip = make_layer_strip(period, top, HEIGHT)
+    GROUND_ART(strip, ground_level - top, random.Random(seed))
+    return ParallaxLayer(strip, 1, top)
+
+def draw_ground(surface, ground_layer, camera_offset):
+    ground_layer.draw(surface, camera_offset)
+
+def draw_ui(surface, coins, lives):
+    # Draw score panel (curved)
+    panel_y = 20
+    pygame.draw.rect(surface, (70, 40, 30, 220), 
+                   (WIDTH//2 - 100, panel_y, 200, 50), 
+                   border_radius=15)
+    pygame.draw.rect(surface, BLACK, 
+                   (WIDTH//2 - 100, panel_y, 200, 50), 
+                   3, border_radius=15)
+    
+    # Draw coin
+    pygame.draw.circle(surface, YELLOW, (WIDTH//2 - 50, panel_y + 25), 15)
+    pygame.draw.circle(surface, ORANGE, (WIDTH//2 - 50, panel_y + 25), 15, 2)
+    
+    # Draw star
+    pygame.draw.circle(surface, (220, 220, 100), (WIDTH//2 + 50, panel_y + 25), 13)
+    pygame.draw.circle(surface, (180, 180, 70), (WIDTH//2 + 50, panel_y + 25), 13, 2)
+    
+    # Draw coin and star counts
+    VectorFont.render_text(surface, f"x{coins}", 
+                        WIDTH//2 - 25, panel_y + 10, 
+                        24, WHITE)
+    
+    VectorFont.render_text(surface, f"x{lives}", 
+                        WIDTH//2 + 75, panel_y + 10, 
+                        24, WHITE)
+    
+    # Draw title with outline
+    VectorFont.render_text(surface, "KOOP THE KOOPA", 
+                        WIDTH//2 - 90, HEIGHT - 40, 
+                        26, YELLOW)
+    
+    # Draw instructions
+    if pygame.time.get_ticks() < 10000:  # Show only in the beginning
+        VectorFont.render_text(surface, "Hold SHIFT to run", 
+                            WIDTH//2 - 80, HEIGHT - 90, 
+                            18, WHITE)
+
+# White sheet and ruled texture of the paper effect, built on first use
+paper_layers = []
+
+def draw_paper_effect(surface, alpha):
+    if not paper_layers:
+        sheet = pygame.Surface((WIDTH, HEIGHT)).convert()
+        sheet.fill(WHITE)
+        texture = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        pygame.draw.rect(texture, BLACK, (0, 0, WIDTH, HEIGHT), 3)
+
+        # Draw paper texture
+        for i in range(0, WIDTH, 20):
+            pygame.draw.line(texture, (0, 0, 0, 30), (i, 0), (i, HEIGHT), 1)
+        for i in range(0, HEIGHT, 20):
+            pygame.draw.line(texture, (0, 0, 0, 30), (0, i), (WIDTH, i), 1)
+        paper_layers.extend([sheet, texture])
+
+    sheet, texture = paper_layers
+    sheet.set_alpha(alpha)
+    surface.blit(sheet, (0, 0))
+    surface.blit(texture, (0, 0))
+
+# Menu and boot screens only change in a few spots, so they are baked once
+# and then patched, handing back the rects that need presenting
+MENU_OPTIONS = ["START GAME", "CONTROLS", "QUIT"]
+# The menu has nothing to animate, so it needn't poll any faster
+MENU_FPS = 30
+
+def draw_menu_background(surface):
+    # Draw menu background
+    surface.fill(MENU_BG)
+    
+    # Draw decorative paper texture
+    for i in range(0, WIDTH, 40):
+        for j in range(0, HEIGHT, 40):
+            pygame.draw.rect(surface, (70, 130, 210), (i, j, 35, 35), 1)
+    
+    # Draw title banner
+    pygame.draw.rect(surface, RED, (0, 50, WIDTH, 120))
+    pygame.draw.rect(surface, (180, 40, 40), (0, 50, WIDTH, 120), 3)
+    
+    # Draw title with vector font
+    VectorFont.render_text(surface, "PAPER MARIO", 
+                        WIDTH//2 - 180, 70, 
+                        60, YELLOW, BLACK, 4)
+    
+    VectorFont.render_text(surface, "KOOPA ENGINE 1.0", 
+                        WIDTH//2 - 220, 130, 
+                        48, WHITE, BLACK, 3)
+    
+    # Draw Koopa character
+    koopa_x = WIDTH//2
+    koopa_y = HEIGHT//2 + 40
+    
+    # Draw shell
+    pygame.draw.ellipse(surface, KOOPA_SHELL, 
+                      (koopa_x - 60, koopa_y - 40, 120, 60))
+    pygame.draw.ellipse(surface, BLACK, 
+                      (koopa_x - 60, koopa_y - 40, 120, 60), 3)
+    
+    # Draw head
+    pygame.draw.ellipse(surface, KOOPA_GREEN, 
+                      (koopa_x - 40, koopa_y - 70, 80, 40))
+    pygame.draw.ellipse(surface, BLACK, 
+                      (koopa_x - 40, koopa_y - 70, 80, 40), 2)
+    
+    # Draw eyes
+    pygame.draw.circle(surface, WHITE, (koopa_x - 15, koopa_y - 55), 10)
+    pygame.draw.circle(surface, WHITE, (koopa_x + 15, koopa_y - 55), 10)
+    pygame.draw.circle(surface, BLACK, (koopa_x - 15, koopa_y - 55), 4)
+    pygame.draw.circle(surface, BLACK, (koopa_x + 15, koopa_y - 55), 4)
+    
+    # Draw bandana
+    bandana_points = [
+        (koopa_x - 50, koopa_y - 70),
+        (koopa_x - 30, koopa_y - 100),
+        (koopa_x + 30, koopa_y - 100),
+        (koopa_x + 50, koopa_y - 70)
+    ]
+    pygame.draw.polygon(surface, BANDANA_BLUE, bandana_points)
+    pygame.draw.polygon(surface, BLACK, bandana_points, 2)
+
+def draw_menu_option(surface, i, selection):
+    y_pos = HEIGHT//2 + 120 + i * 50
+    color = WHITE if i != selection else YELLOW
+    
+    # Draw selection highlight
+    if i == selection:
+        pygame.draw.rect(surface, MENU_HIGHLIGHT, 
+                      (WIDTH//2 - 110, y_pos - 25, 220, 40), 
+                      border_radius=10)
+        pygame.draw.rect(surface, BLACK, 
+                      (WIDTH//2 - 110, y_pos - 25, 220, 40), 
+                      3, border_radius=10)
+    
+    # Draw option text
+    VectorFont.render_text(surface, MENU_OPTIONS[i], 
+                        WIDTH//2 - 80, y_pos - 10, 
+                        30, color)
+
+def menu_option_rect(i):
+    # Everything draw_menu_option can touch for row i
+    y_pos = HEIGHT//2 + 120 + i * 50
+    pad = VectorFont.padding(2)
+    text = VectorFont.render(MENU_OPTIONS[i], 30, WHITE)
+    return pygame.Rect(WIDTH//2 - 110, y_pos - 25, 220, 40).union(
+        pygame.Rect(WIDTH//2 - 80 - pad, y_pos - 10 - pad, text.get_width(), text.get_height()))
+
+def draw_menu_footer(surface):
+    # Draw copyright
+    VectorFont.render_text(surface, "© 2023 KOOPA STUDIOS", 
+                        WIDTH//2 - 120, HEIGHT - 30, 
+                        20, WHITE)
+
+class MenuScreen:
+    def __init__(self):
+        self.background = None
+        self.selection = None
+        
+    def invalidate(self):
+        # Next draw repaints the whole screen
+        self.selection = None
+        
+    def draw(self, surface, selection):
+        if self.background is None:
+            self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+            draw_menu_background(self.background)
+        
+        if self.selection is None:
+            surface.blit(self.background, (0, 0))
+            for i in range(len(MENU_OPTIONS)):
+                draw_menu_option(surface, i, selection)
+            draw_menu_footer(surface)
+            dirty = [surface.get_rect()]
+        elif selection != self.selection:
+            # Repaint just the rows losing and gaining the highlight
+            dirty = []
+            for i in (self.selection, selection):
+                rect = menu_option_rect(i)
+                surface.blit(self.background, rect, rect)
+                draw_menu_option(surface, i, selection)
+                # The footer overlaps the last row, so lay it back on top
+                surface.set_clip(rect)
+                draw_menu_footer(surface)
+                surface.set_clip(None)
+                dirty.append(rect)
+        else:
+            dirty = []
+        
+        self.selection = selection
+        return dirty
+
+# Loading bar placement
+BOOT_BAR = pygame.Rect((WIDTH - 400) // 2, HEIGHT // 2 + 50, 400, 30)
+
+def draw_boot_background(surface):
+    # Draw boot screen background
+    surface.fill((30, 30, 60))
+    
+    # Draw loading bar frame
+    pygame.draw.rect(surface, (60, 60, 100), BOOT_BAR)
+    pygame.draw.rect(surface, BLACK, BOOT_BAR, 3)
+    
+    # Draw loading text
+    VectorFont.render_text(surface, "LOADING KOOPA ENGINE...", 
+                        WIDTH//2 - 180, HEIGHT//2 - 30, 
+                        36, WHITE)
+    
+    # Draw decorative elements
+    for i in range(20):
+        size = random.randint(5, 15)
+        x = random.randint(0, WIDTH)
+        y = random.randint(0, HEIGHT//2 - 50)
+        pygame.draw.circle(surface, (100, 100, 200), (x, y), size)
+        pygame.draw.circle(surface, (70, 70, 180), (x, y), size, 1)
+
+class BootScreen:
+    def __init__(self):
+        self.background = None
+        self.percent_rect = None
+        self.shown = None
+        
+    def invalidate(self):
+        # Next draw repaints the whole screen, with fresh decorations
+        self.background = None
+        
+    def draw(self, surface, progress):
+        full = self.background is None
+        if full:
+            self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+            draw_boot_background(self.background)
+            surface.blit(self.background, (0, 0))
+            self.percent_rect = None
+        
+        fill_width = int(BOOT_BAR.width * progress)
+        percent = int(progress * 100)
+        if not full and (fill_width, percent) == self.shown:
+            return []
+        self.shown = (fill_width, percent)
+        
+        # Draw loading bar
+        surface.blit(self.background, BOOT_BAR, BOOT_BAR)
+        pygame.draw.rect(surface, BLUE, 
+                       (BOOT_BAR.x, BOOT_BAR.y, fill_width, BOOT_BAR.height))
+        
+        # Draw progress percentage
+        text = VectorFont.render(f"{percent}%", 24, WHITE)
+        pad = VectorFont.padding(2)
+        rect = text.get_rect(topleft=(WIDTH//2 - 30 - pad, BOOT_BAR.bottom + 20 - pad))
+        if self.percent_rect:
+            surface.blit(self.background, self.percent_rect, self.percent_rect)
+            rect = rect.union(self.percent_rect)
+        surface.blit(text, (WIDTH//2 - 30 - pad, BOOT_BAR.bottom + 20 - pad))
+        self.percent_rect = rect
+        
+        if full:
+            return [surface.get_rect()]
+        return [BOOT_BAR, rect]
+
+class TitleScreen:
+    # A variant's "press SPACE" title card; it never changes, so it is drawn once
+    def __init__(self, draw_card):
+        self.draw_card = draw_card
+        self.background = None
+        self.shown = False
+
+    def invalidate(self):
+        self.shown = False
+
+    def draw(self, surface):
+        if self.background is None:
+            self.background = pygame.Surface((WIDTH, HEIGHT)).convert()
+            self.draw_card(self.background)
+        if self.shown:
+            return []
+        surface.blit(self.background, (0, 0))
+        self.shown = True
+        return [surface.get_rect()]
+
+# Stages are JSON Lines: a header line, then one line per STAGE_CHUNK_WIDTH-wide
+# slice of the world. Objects use absolute world coordinates and belong to the
+# chunk their left edge falls in:
+#   platforms [x, y, width, height, kind, [r, g, b]]
+#   coins     [x, y]
+#   goombas   [x, walk_range]
+# The header may also give start_x, where Koops enters; STAGE_START_X otherwise
+STAGE_FORMAT = "koopa-stage"
+STAGE_VERSION = 1
+STAGE_CHUNK_WIDTH = 1024
+STAGE_START_X = 400
+STAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stages")
+DEFAULT_STAGE = os.path.join(STAGE_DIR, "koops_demo.stage")
+# Chunks streamed in past the right screen edge, and kept behind the left one
+STAGE_LOAD_AHEAD = 1
+STAGE_KEEP_BEHIND = 1
+
+def save_stage(path, platforms, coins, goombas, width, ground_level,
+               seed=GROUND_SEED, chunk_width=STAGE_CHUNK_WIDTH, start_x=None):
+    # platforms, coins and goombas are lists of records in the format above
+    count = max(1, -(-width // chunk_width))
+    chunks = [{"platforms": [], "coins": [], "goombas": []} for _ in range(count)]
+    for key, records in (("platforms", platforms), ("coins", coins), ("goombas", goombas)):
+        for record in records:
+            if key == "platforms" and record[2] > chunk_width:
+                raise ValueError(f"platform at x={record[0]} is wider than a chunk")
+            index = min(count - 1, max(0, int(record[0] // chunk_width)))
+            chunks[index][key].append(record)
+    
+    header = {"format": STAGE_FORMAT, "version": STAGE_VERSION, "width": width,
+              "ground_level": ground_level, "seed": seed,
+              "chunk_width": chunk_width, "chunks": count}
+    if start_x is not None:
+        header["start_x"] = start_x
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        for line in [header] + chunks:
+            f.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+def generate_stage(path, screens, seed=0):
+    # Seeded random stage, for trying out long levels
+    rng = random.Random(seed)
+    ground_level = HEIGHT - 60
+    width = screens * WIDTH
+    colors = [(180, 160, 130), (150, 200, 150), LIGHT_BROWN, (200, 150, 100)]
+    platforms, coins, goombas = [], [], []
+    x = 300
+    while x < width - 200:
+        kind = rng.choice(["brick", "brick", "cloud", "spike"])
+        if kind == "spike":
+            platforms.append([x, ground_level - 40, 80, 20, kind, list(LIGHT_BROWN)])
+        else:
+            y = ground_level - rng.randrange(80, 240, 20)
+            w = rng.randrange(70, 150, 10)
+            platforms.append([x, y, w, 20, kind, list(rng.choice(colors))])
+            coins.append([x + w // 2, y - 30])
+        if rng.random() < 0.4:
+            goombas.append([x + 150, rng.choice([100, 150])])
+        x += rng.randrange(250, 400)
+    save_stage(path, platforms, coins, goombas, width, ground_level, seed)
+
+class StageFile:
+    # Seekable reader; only the line offsets are kept in memory
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != STAGE_FORMAT or header.get("version") != STAGE_VERSION:
+                raise ValueError(f"{path}: not a version {STAGE_VERSION} stage file")
+            self.offsets = []
+            offset = f.tell()
+            for line in f:
+                self.offsets.append(offset)
+                offset += len(line)
+        
+        self.width = header["width"]
+        self.ground_level = header["ground_level"]
+        self.seed = header["seed"]
+        self.chunk_width = header["chunk_width"]
+        self.start_x = header.get("start_x", STAGE_START_X)
+        if len(self.offsets) != header["chunks"]:
+            raise ValueError(f"{path}: expected {header['chunks']} chunks, found {len(self.offsets)}")
+        
+    def __len__(self):
+        return len(self.offsets)
+        
+    def read_chunk(self, index):
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[index])
+            return json.loads(f.readline())
+
+class Stage:
+    # The slice of a stage file currently loaded around the camera
+    def __init__(self, source, seed=None):
+        self.source = source
+        self.width = source.width
+        self.ground_level = source.ground_level
+        self.start_x = source.start_x
+        self.ground = build_ground_layer(self.ground_level, source.seed if seed is None else seed)
+        self.grid = StageGrid()
+        self.chunks = {}
+        
+        # Progress outlives eviction: (chunk, index) of every coin and Goomba dealt with
+        self.collected = set()
+        self.crushed = set()
+        
+        self.platforms = []
+        self.coins = []
+        self.goombas = []
+        self.refresh()
+        
+    def refresh(self):
+        # Rebuild everything derived from the set of loaded objects
+        self.platform_index = SpanIndex(self.platforms)
+        self.coin_index = SpanIndex(self.coins)
+        self.goomba_index = SpanIndex(self.goombas)
+        self.swarm = GoombaSwarm(self.goombas)
+        
+    def visible(self, left, right):
+        # Loaded platforms, coins and Goombas that can draw inside [left, right)
+        return (self.platform_index.overlapping(left, right),
+                self.coin_index.overlapping(left, right),
+                self.goomba_index.overlapping(left, right))
+        
+    def load(self, index):
+        data = self.source.read_chunk(index)
+        ground_level = self.ground_level
+        
+        platforms = []
+        for x, y, width, height, kind, color in data["platforms"]:
+            platforms.append(Platform(x, y, width, height, tuple(color),
+                                      is_spike=kind == "spike", is_cloud=kind == "cloud"))
+        
+        coins = []
+        for i, (x, y) in enumerate(data["coins"]):
+            coin = Coin(x, y)
+            coin.key = (index, i)
+            coin.collected = coin.key in self.collected
+            coins.append(coin)
+        
+        goombas = []
+        for i, (x, walk_range) in enumerate(data["goombas"]):
+            goomba = Goomba(x, ground_level, ground_level, walk_range)
+            goomba.key = (index, i)
+            goomba.crushed = goomba.key in self.crushed
+            goombas.append(goomba)
+        
+        self.chunks[index] = (platforms, coins, goombas)
+        self.grid.add(platforms, coins)
+        
+    def evict(self, index):
+        platforms, coins, goombas = self.chunks.pop(index)
+        self.grid.remove(platforms, coins)
+        
+    def stream(self, camera_offset):
+        # Load every chunk near the screen; unload those well clear of it
+        chunk_width = self.source.chunk_width
+        first = max(0, int(camera_offset // chunk_width) - STAGE_KEEP_BEHIND)
+        last = min(len(self.source) - 1,
+                   int((camera_offset + WIDTH) // chunk_width) + STAGE_LOAD_AHEAD)
+        
+        # One chunk of slack either way, so hovering on a border doesn't thrash
+        kept = {index for index in self.chunks if first - 1 <= index <= last + 1}
+        self.keep(kept.union(range(first, last + 1)))
+        
+    def keep(self, indices):
+        # Make exactly these chunks the loaded ones
+        stale = [index for index in self.chunks if index not in indices]
+        missing = sorted(index for index in indices if index not in self.chunks)
+        for index in stale:
+            self.evict(index)
+        for index in missing:
+            self.load(index)
+        
+        if stale or missing:
+            self.platforms, self.coins, self.goombas = [], [], []
+            for index in sorted(self.chunks):
+                platforms, coins, goombas = self.chunks[index]
+                self.platforms += platforms
+                self.coins += coins
+                self.goombas += goombas
+            self.refresh()
+                
+    # Counts of loaded chunks, collected coins and crushed Goombas; the chunk
+    # indices and (chunk, index) keys follow as unsigned ints
+    STATE = struct.Struct("<3I")
+    
+    def save_state(self):
+        collected = [n for key in sorted(self.collected) for n in key]
+        crushed = [n for key in sorted(self.crushed) for n in key]
+        ints = sorted(self.chunks) + collected + crushed
+        return (Stage.STATE.pack(len(self.chunks), len(self.collected), len(self.crushed)) +
+                struct.pack(f"<{len(ints)}I", *ints) + self.swarm.save_state())
+        
+    def load_state(self, data, offset, clock):
+        chunks, collected, crushed = Stage.STATE.unpack_from(data, offset)
+        offset += Stage.STATE.size
+        count = chunks + 2 * (collected + crushed)
+        ints = struct.unpack_from(f"<{count}I", data, offset)
+        offset += 4 * count
+        
+        keys = ints[chunks:]
+        self.collected = set(zip(keys[0:2 * collected:2], keys[1:2 * collected:2]))
+        keys = keys[2 * collected:]
+        self.crushed = set(zip(keys[0::2], keys[1::2]))
+        self.keep(set(ints[:chunks]))
+        
+        # Bring the loaded coins and their broadphase entries in line
+        coin_grid = self.grid.coins
+        for coin in self.coins:
+            coin.collected = coin.key in self.collected
+            if coin.collected:
+                coin_grid.remove(coin)
+            elif coin not in coin_grid.spans:
+                coin_grid.insert(coin, coin.x, coin.y, 0, 0)
+            coin.update(clock)
+        
+        return self.swarm.load_state(data, offset)
+        
+    def collect(self, coin):
+        coin.collected = True
+        self.collected.add(coin.key)
+        self.grid.coins.remove(coin)
+        
+    def crush(self, goomba):
+        goomba.crushed = True
+        self.crushed.add(goomba.key)
+
+def create_stage(seed=None, path=None):
+    return Stage(StageFile(path or DEFAULT_STAGE), seed)
+
+# Frame phases timed by FrameProfiler, in overlay order
+PROFILE_PHASES = ["events", "camera", "physics", "particles", "goombas",
+                  "background", "cull", "platforms", "sprites", "ui", "dialog", "present"]
+# Frames kept in each phase's rolling histogram
+PROFILE_WINDOW = 300
+PROFILE_BUCKETS = 160
+# Frames between overlay text refreshes
+PROFILE_OVERLAY_REFRESH = 15
+PROFILE_KEY = pygame.K_F3
+
+def ns_bucket(ns):
+    # Quarter-octave buckets: the octave from bit_length, then the next two bits
+    bits = ns.bit_length()
+    if bits < 3:
+        return ns
+    return min((bits - 2) * 4 + ((ns >> (bits - 3)) & 3), PROFILE_BUCKETS - 1)
+
+def bucket_floor(bucket):
+    if bucket < 8:
+        return bucket
+    return (4 + bucket % 4) << (bucket // 4 - 1)
+
+class FrameProfiler:
+    # Per-phase frame timings; start() and lap() cost one attribute check while disabled
+    def __init__(self, phases=PROFILE_PHASES, window=PROFILE_WINDOW):
+        self.phases = phases
+        self.enabled = False
+        self.show_overlay = False
+        self.frame = dict.fromkeys(phases, 0)
+        self.history = {phase: deque(maxlen=window) for phase in phases}
+        self.counts = {phase: [0] * PROFILE_BUCKETS for phase in phases}
+        self.frame_index = 0
+        self.trace = None
+        self.trace_writer = None
+        self.overlay = None
+        
+    def start(self):
+        return time.perf_counter_ns() if self.enabled else 0
+        
+    def lap(self, phase, t):
+        # Charge the time since t to phase and return a new start mark
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+        self.frame[phase] += now - t
+        return now
+        
+    def end_frame(self):
+        if not self.enabled:
+            return
+        for phase, ns in self.frame.items():
+            history = self.history[phase]
+            counts = self.counts[phase]
+            if len(history) == history.maxlen:
+                counts[history[0]] -= 1
+            bucket = ns_bucket(ns)
+            history.append(bucket)
+            counts[bucket] += 1
+        
+        if self.trace_writer:
+            self.trace_writer(self.frame_index, self.frame)
+        
+        self.frame = dict.fromkeys(self.phases, 0)
+        self.frame_index += 1
+        
+    def percentile(self, phase, q):
+        # Upper edge of the bucket holding the q-th percentile, in nanoseconds
+        history = self.history[phase]
+        if not history:
+            return 0
+        target = q / 100 * len(history)
+        seen = 0
+        for bucket, count in enumerate(self.counts[phase]):
+            seen += count
+            if seen >= target:
+                return bucket_floor(bucket + 1)
+        return bucket_floor(PROFILE_BUCKETS)
+        
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self.enabled = self.show_overlay or self.trace is not None
+        
+    def open_trace(self, path):
+        # Stream one row per frame; the format follows the file extension
+        self.trace = open(path, "w", newline="")
+        self.enabled = True
+        if path.endswith(".jsonl"):
+            def write(frame_index, frame):
+                self.trace.write(json.dumps(dict(frame=frame_index, **frame)) + "\n")
+        else:
+            writer = csv.writer(self.trace)
+            writer.writerow(["frame"] + self.phases + ["total"])
+            def write(frame_index, frame):
+                values = [frame[phase] for phase in self.phases]
+                writer.writerow([frame_index] + values + [sum(values)])
+        self.trace_writer = write
+        
+    def close(self):
+        if self.trace:
+            self.trace.close()
+            self.trace = None
+            self.trace_writer = None
+            self.enabled = self.show_overlay
+            
+    def draw_overlay(self, surface):
+        if not self.show_overlay:
+            return
+        if self.overlay is None or self.frame_index % PROFILE_OVERLAY_REFRESH == 0:
+            font = get_font(None, 18)
+            rows = [["phase (ms)", "p50", "p95", "p99"]]
+            for phase in self.phases:
+                rows.append([phase] + [f"{self.percentile(phase, q) / 1e6:.2f}" for q in (50, 95, 99)])
+            
+            self.overlay = pygame.Surface((260, 14 * len(rows) + 8), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 170))
+            for i, row in enumerate(rows):
+                for j, cell in enumerate(row):
+                    text = font.render(cell, True, WHITE)
+                    # Phase names left-aligned, numbers right-aligned
+                    x = 6 if j == 0 else 80 + j * 55 - text.get_width()
+                    self.overlay.blit(text, (x, 4 + i * 14))
+        surface.blit(self.overlay, (WIDTH - self.overlay.get_width() - 5, 5))
+
+# The tech demo look DSKoopa and R1V2 share, and Paper3D's platforms and
+# ground with it: one 600x400 screen of plank platforms over banded ground
+TECH_DEMO_STAGE = os.path.join(STAGE_DIR, "tech_demo.stage")
+
+TECH_DEMO_PALETTE = {
+    "BACKGROUND": (41, 129, 194),
+    "GROUND_COLOR": (120, 78, 58),
+    "GREEN": (65, 152, 57),
+    "RED": (217, 65, 65),
+    "YELLOW": (245, 203, 66),
+    "BLUE": (66, 135, 245),
+    "BROWN": (139, 69, 19),
+    "LIGHT_BROWN": (160, 120, 80),
+    "WHITE": (255, 255, 255),
+    "BLACK": (30, 30, 30),
+    "KOOPA_GREEN": (85, 180, 70),
+    "KOOPA_SHELL": (180, 210, 80),
+    "KOOPA_DARK": (60, 130, 50),
+    "BANDANA_BLUE": (70, 130, 230),
+    "PURPLE": (150, 70, 200),
+    "ORANGE": (245, 150, 66),
+    "PAPER_YELLOW": (250, 240, 180)
+}
+
+# A smaller, floatier Koops
+TECH_DEMO_KOOPS = {
+    "width": 35,
+    "height": 45,
+    "crouch_height": 30,
+    "walking_speed": 4,
+    "running_speed": 4,
+    "jump_power": 12,
+    "gravity": 0.6
+}
+
+def draw_plank_platform(surface, x, y, width, height, color, kind):
+    if kind == "spike":
+        # Draw spike platform
+        pygame.draw.rect(surface, (100, 100, 100), (x, y, width, height))
+        pygame.draw.rect(surface, BLACK, (x, y, width, height), 2)
+        
+        # Draw spikes
+        for i in range(0, width, 15):
+            spike_points = [
+                (x + i, y),
+                (x + i + 7, y - 10),
+                (x + i + 14, y)
+            ]
+            pygame.draw.polygon(surface, (80, 80, 80), spike_points)
+            pygame.draw.polygon(surface, BLACK, spike_points, 1)
+    else:
+        # Draw normal platform
+        pygame.draw.rect(surface, color, (x, y, width, height))
+        pygame.draw.rect(surface, BROWN, (x, y, width, height), 2)
+        
+        # Draw platform details
+        for i in range(0, width, 10):
+            pygame.draw.line(surface, BROWN, (x + i, y), (x + i, y + height), 1)
+
+def draw_banded_ground(surface, ground_y, rng):
+    width, height = surface.get_size()
+    pygame.draw.rect(surface, GROUND_COLOR, (0, ground_y, width, height - ground_y))
+    
+    # Draw grass on top
+    pygame.draw.rect(surface, GREEN, (0, ground_y, width, 10))
+    
+    # Draw ground details
+    for i in range(0, width, 15):
+        pygame.draw.line(surface, (100, 60, 40), (i, ground_y), (i, height), 1)
+
+def draw_paper_koops(surface, koops, x, y):
+    # The tech demo's own Koops, drawn live rather than from the pose atlas,
+    # animated off the same anim_time
+    t = koops.anim_time
+    
+    # Draw Koops body
+    body_height = 30
+    
+    # Draw shell (darker green for Koops)
+    pygame.draw.ellipse(surface, (160, 190, 70), (x - 15, y - body_height + 10, koops.width, body_height))
+    pygame.draw.ellipse(surface, BLACK, (x - 15, y - body_height + 10, koops.width, body_height), 2)
+    
+    # Draw shell pattern
+    for i in range(3):
+        pygame.draw.ellipse(surface, (140, 170, 60), 
+                            (x - 5 + i*10, y - body_height + 20, 7, 15))
+    
+    # Draw head
+    head_x = x
+    head_y = y - body_height - 5 + math.sin(t) * 3
+    bandana_flap = math.sin(t * 2) * 2
+    
+    # Draw bandana
+    bandana_points = [
+        (head_x - 15, head_y - 5),
+        (head_x - 10, head_y - 8 - bandana_flap),
+        (head_x + 10, head_y - 8 - bandana_flap),
+        (head_x + 15, head_y - 5)
+    ]
+    pygame.draw.polygon(surface, BANDANA_BLUE, bandana_points)
+    pygame.draw.polygon(surface, BLACK, bandana_points, 2)
+    
+    # Draw head
+    pygame.draw.ellipse(surface, KOOPA_GREEN, (head_x - 12, head_y, 24, 16))
+    pygame.draw.ellipse(surface, BLACK, (head_x - 12, head_y, 24, 16), 2)
+    
+    # Draw eyes based on direction
+    eye_x = head_x - 6 if koops.direction == -1 else head_x + 6
+    pygame.draw.circle(surface, WHITE, (eye_x, head_y + 6), 5)
+    pygame.draw.circle(surface, BLACK, (eye_x, head_y + 6), 2)
+    
+    # Draw feet
+    for i in range(2):
+        offset = math.sin(t + i) * 3
+        pygame.draw.ellipse(surface, KOOPA_DARK, (x - 15 + i*20, y + offset, 8, 6))
+        
+    # Draw crouching effect
+    if koops.crouching:
+        pygame.draw.rect(surface, (0, 0, 0, 100), (x - 20, y - 5, koops.width + 10, 5))
+        
+    # Draw hit points
+    for i in range(koops.hit_points):
+        pygame.draw.circle(surface, RED, (x + i*10, y - 40), 4)
+
+coin_sprite = None
+
+def draw_rotating_coin(surface, coin, x, y):
+    global coin_sprite
+    if coin_sprite is None:
+        # Create a surface for the coin to rotate
+        coin_sprite = pygame.Surface((20, 20), pygame.SRCALPHA)
+        pygame.draw.circle(coin_sprite, YELLOW, (10, 10), 10)
+        pygame.draw.circle(coin_sprite, (200, 170, 0), (10, 10), 10, 2)
+        pygame.draw.circle(coin_sprite, (180, 150, 0), (10, 10), 6)
+    
+    # Rotate the coin
+    rotated_coin = pygame.transform.rotate(coin_sprite, coin.rotation)
+    surface.blit(rotated_coin, (x - rotated_coin.get_width()//2,
+                                y - rotated_coin.get_height()//2))
+
+# How a variant dresses the game, all replaceable through configure():
+# START_SCREEN is "menu" for the menu and boot screens, a function drawing a
+# title card that SPACE dismisses, or None to drop straight into the stage
+START_SCREEN = "menu"
+HUD = draw_ui
+# PLATFORM_ART, GROUND_ART and COIN_ART draw the stage itself; see
+# draw_platform, draw_ground_strip and draw_coin for what each is handed
+PLATFORM_ART = draw_platform
+GROUND_ART = draw_ground_strip
+COIN_ART = draw_coin
+KOOPS_ART = draw_koops  # Handed the Koops and its interpolated screen position
+SCENERY = True  # Parallax sky, mountains and clouds behind the stage
+PAPER_DEATH = False  # Flash the paper effect when a life is lost
+# SPIKE_HIT is "knockback" to take a hit with invincibility frames and be
+# thrown clear sideways, or "bounce" to lose a hit point on every touch and
+# be popped straight back up
+SPIKE_HIT = "knockback"
+RESPAWN_X = None  # World x to come back at after a lost life; None for mid-view
+DIALOG_TEXT = "JUMP ON ENEMIES TO DEFEAT THEM! WATCH OUT FOR SPIKES!"
+
+# configure() keywords that simply rebind one of the settings
+SETTINGS = {
+    "caption": "CAPTION",
+    "stage": "DEFAULT_STAGE",
+    "start_screen": "START_SCREEN",
+    "hud": "HUD",
+    "platform": "PLATFORM_ART",
+    "ground": "GROUND_ART",
+    "coin": "COIN_ART",
+    "koops_art": "KOOPS_ART",
+    "scenery": "SCENERY",
+    "paper_death": "PAPER_DEATH",
+    "spike_hit": "SPIKE_HIT",
+    "respawn_x": "RESPAWN_X",
+    "dialog": "DIALOG_TEXT",
+    "pose_phases": "POSE_PHASES"
+}
+
+def configure(size=None, palette=None, koops=None, **settings):
+    # Rebind the engine's settings for a variant; must run before the window
+    # opens, since everything drawn from then on is built from them
+    global WIDTH, HEIGHT, BOOT_BAR, PARTICLE_COLORS
+    if screen is not None:
+        raise RuntimeError("configure() must be called before init_display()")
+    
+    if size:
+        WIDTH, HEIGHT = size
+        BOOT_BAR = pygame.Rect((WIDTH - 400) // 2, HEIGHT // 2 + 50, 400, 30)
+    
+    if palette:
+        for name in palette:
+            if name not in PALETTE:
+                raise ValueError(f"unknown palette color: {name}")
+        globals().update(palette)
+        PARTICLE_COLORS = [YELLOW, BROWN, RED]
+    
+    if koops:
+        for name in koops:
+            if name not in KOOPS_TUNING:
+                raise ValueError(f"unknown Koops tuning: {name}")
+        KOOPS_TUNING.update(koops)
+    
+    for name, value in settings.items():
+        if name not in SETTINGS:
+            raise TypeError(f"configure() got an unknown setting: {name}")
+        globals()[SETTINGS[name]] = value
+
+# Seconds of gameplay kept for rewinding (hold BACKSPACE)
+REWIND_SECONDS = 10
+# Most memory the rewind history may hold, whatever is alive in the stage;
+# when over, the oldest seconds go first (a typical 10s history is ~2MB)
+REWIND_BYTES = 8 * 1024 * 1024
+REWIND_KEY = pygame.K_BACKSPACE
+# Window events after which the OS may have lost what was on screen; cached
+# screens only present what changed, so these force a full repaint
+REPAINT_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN,
+                  pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED,
+                  pygame.WINDOWFOCUSGAINED)
+# Start of every snapshot: magic, game state, coins, lives, camera, previous camera,
+# clock, paper effect timer and alpha
+SNAPSHOT_HEADER = struct.Struct("<4sBii3d2i")
+SNAPSHOT_MAGIC = b"KOOP"
+
+class SnapshotHistory:
+    # The newest snapshots, capped both in count and in total bytes
+    def __init__(self, maxlen, max_bytes=REWIND_BYTES):
+        self.snapshots = deque()
+        self.maxlen = maxlen
+        self.max_bytes = max_bytes
+        self.size = 0
+        
+    def __len__(self):
+        return len(self.snapshots)
+        
+    def append(self, data):
+        if len(data) > self.max_bytes:
+            # Too big to keep at all; older ones would rewind across a gap
+            self.clear()
+            return
+        self.snapshots.append(data)
+        self.size += len(data)
+        while len(self.snapshots) > self.maxlen or self.size > self.max_bytes:
+            self.size -= len(self.snapshots.popleft())
+            
+    def pop(self):
+        data = self.snapshots.pop()
+        self.size -= len(data)
+        return data
+        
+    def clear(self):
+        self.snapshots.clear()
+        self.size = 0
+
+class Game:
+    def __init__(self, seed=None, stage_path=None, rewind_seconds=REWIND_SECONDS,
+                 rewind_bytes=REWIND_BYTES):
+        self.game_state = GAME_STATES["MENU" if START_SCREEN == "menu" else "TITLE"]
+        self.running = True
+        
+        # Every random decision in a session flows from this seed
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.stage_path = stage_path
+        
+        # Menu variables
+        self.menu_selection = 0
+        self.boot_progress = 0
+        self.menu_screen = MenuScreen()
+        self.boot_screen = BootScreen()
+        self.title_screen = TitleScreen(START_SCREEN) if callable(START_SCREEN) else None
+        self.drawn_state = None
+        
+        # Dialog box
+        self.dialog = DialogBox(DIALOG_TEXT or "", 
+                               WIDTH//2 - 250, 100, 500, 80)
+        
+        # Particles for effects
+        self.particles = ParticleSystem(rng=np.random.default_rng(seed))
+        
+        # Animation time, stepped with the simulation so replays look the same
+        self.frame_clock = FrameClock()
+        
+        # Per-phase frame timings (off until asked for)
+        self.profiler = FrameProfiler()
+        
+        # A snapshot per step for rewinding, and one from the start for retries
+        self.history = SnapshotHistory(int(rewind_seconds * SIM_HZ), rewind_bytes)
+        self.rewinding = False
+        self.checkpoint = None
+        
+        # Create game objects
+        self.reset()
+        
+        # Camera system - follows Koops horizontally
+        self.camera_offset = 0
+        self.prev_camera_offset = 0
+        
+        if START_SCREEN is None:
+            self.start()
+        
+    def reset(self):
+        self.stage = create_stage(self.seed, self.stage_path)
+        self.ground_level = self.stage.ground_level
+        self.koops = Koops(self.stage.start_x, self.ground_level - 100, self.rng, self.stage.width)
+        self.stage.stream(self.koops.x - WIDTH//2)
+        self.collected_coins = 0
+        self.lives = 3
+        
+        # Paper effect shown after losing a life
+        self.paper_timer = 0
+        self.paper_alpha = 0
+        
+    def start(self):
+        self.game_state = GAME_STATES["GAMEPLAY"]
+        if self.dialog.text:
+            self.dialog.open_box()
+        self.checkpoint = self.snapshot()
+        
+    def snapshot(self):
+        # The whole simulation as one flat buffer, for restore()
+        return b"".join((
+            SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, self.game_state, self.collected_coins, self.lives,
+                                 self.camera_offset, self.prev_camera_offset, self.frame_clock.ticks,
+                                 self.paper_timer, self.paper_alpha),
+            pack_random_state(self.rng),
+            self.koops.save_state(),
+            self.dialog.save_state(),
+            self.particles.save_state(),
+            self.stage.save_state()
+        ))
+        
+    def restore(self, data):
+        # Put the simulation back exactly as snapshot() found it
+        (magic, self.game_state, self.collected_coins, self.lives, self.camera_offset,
+         self.prev_camera_offset, ticks, self.paper_timer,
+         self.paper_alpha) = SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("not a Koops engine snapshot")
+        self.frame_clock = FrameClock(ticks)
+        
+        offset = unpack_random_state(self.rng, data, SNAPSHOT_HEADER.size)
+        offset = self.koops.load_state(data, offset)
+        offset = self.dialog.load_state(data, offset)
+        offset = self.particles.load_state(data, offset)
+        self.stage.load_state(data, offset, self.frame_clock)
+        
+    def handle_event(self, event):
+        koops = self.koops
+        
+        if event.type == pygame.QUIT:
+            self.running = False
+        
+        elif event.type in REPAINT_EVENTS:
+            self.invalidate()
+        
+        elif event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key == REWIND_KEY:
+            self.rewinding = event.type == pygame.KEYDOWN
+        
+        elif event.type == pygame.KEYDOWN:
+            if self.game_state == GAME_STATES["MENU"]:
+                if event.key == pygame.K_DOWN:
+                    self.menu_selection = (self.menu_selection + 1) % len(MENU_OPTIONS)
+                elif event.key == pygame.K_UP:
+                    self.menu_selection = (self.menu_selection - 1) % len(MENU_OPTIONS)
+                elif event.key == pygame.K_RETURN:
+                    if self.menu_selection == 0:  # Start Game
+                        self.game_state = GAME_STATES["BOOT"]
+                        self.boot_progress = 0
+                    elif self.menu_selection == 2:  # Quit
+                        self.running = False
+            
+            elif self.game_state == GAME_STATES["TITLE"]:
+                if event.key == pygame.K_SPACE:
+                    self.start()
+            
+            elif self.game_state == GAME_STATES["GAMEPLAY"]:
+                if event.key == pygame.K_SPACE or event.key == pygame.K_w:
+                    koops.jump()
+                elif event.key == pygame.K_s:
+                    koops.crouch(True)
+                elif event.key == pygame.K_LSHIFT:
+                    koops.run(True)
+            
+            elif self.game_state == GAME_STATES["GAME_OVER"] and event.key == pygame.K_r:
+                # Back to how the stage started, without rebuilding it
+                self.restore(self.checkpoint)
+                self.history.clear()
+        
+        elif event.type == pygame.KEYUP and self.game_state == GAME_STATES["GAMEPLAY"]:
+            if event.key == pygame.K_s:
+                koops.crouch(False)
+            elif event.key == pygame.K_LSHIFT:
+                koops.run(False)
+                
+    def update(self, dx):
+        # Advance the simulation by one fixed step of SIM_DT seconds
+        if self.game_state == GAME_STATES["BOOT"]:
+            # Update boot progress
+            self.boot_progress += 0.02
+            if self.boot_progress >= 1.0:
+                self.start()
+        
+        elif self.game_state == GAME_STATES["GAMEPLAY"] or self.game_state == GAME_STATES["GAME_OVER"]:
+            if self.rewinding:
+                # Step backwards through history instead of forwards
+                if self.history:
+                    self.restore(self.history.pop())
+                return
+            if self.history.maxlen:
+                self.history.append(self.snapshot())
+            self.update_gameplay(dx)
+            
+    def update_gameplay(self, dx):
+        koops = self.koops
+        stage = self.stage
+        grid = stage.grid
+        particles = self.particles
+        clock = self.frame_clock
+        prof = self.profiler
+        t = prof.start()
+        clock.advance(SIM_DT)
+        
+        # Remember where everything was for render interpolation
+        self.prev_camera_offset = self.camera_offset
+        koops.save_previous()
+        stage.swarm.save_previous()
+        
+        # Update camera; a stage no wider than the window stays put
+        if stage.width > WIDTH:
+            target_offset = koops.x - WIDTH//2
+            self.camera_offset = self.camera_offset * 0.9 + target_offset * 0.1
+        
+        # Bring in the chunks around the camera before anything touches them
+        stage.stream(self.camera_offset)
+        t = prof.lap("camera", t)
+        
+        # Move Koops
+        koops.move(dx)
+        
+        # Update game objects
+        koops.update(clock, grid.platforms, self.ground_level)
+        self.dialog.update()
+        
+        for coin in stage.coins:
+            coin.update(clock)
+        
+        # Check coin collection
+        for coin in grid.coins.query(koops.x - 30, koops.y - 30, 60, 60):
+            if (koops.x - coin.x)**2 + (koops.y - coin.y)**2 < 30 * 30:
+                stage.collect(coin)
+                self.collected_coins += 1
+                # Add coin particle effect
+                particles.emit(coin.x, coin.y, 10,
+                               (-2.5, 2.5), (-3.5, -1.5),
+                               30,  # max life
+                               YELLOW)
+        
+        t = prof.lap("physics", t)
+        
+        # Update particles
+        particles.update()
+        t = prof.lap("particles", t)
+        
+        # Update Goombas
+        swarm = stage.swarm
+        swarm.update(clock)
+        
+        # Goomba collision; the overlap tests run over the whole swarm at once,
+        # then the few hits are resolved in order since a stomp changes Koops
+        hits, stomps = swarm.touching(koops.x, koops.y, koops.width, koops.height)
+        for i, from_above in zip(hits, stomps):
+            goomba = stage.goombas[i]
+            if from_above and koops.velocity_y > 0:
+                # Jumped on enemy
+                stage.crush(goomba)
+                koops.velocity_y = -koops.jump_power * 0.7
+                # Add particle effect
+                particles.emit(goomba.x, goomba.y, 15,
+                               (-2.5, 2.5), (-4, -2),
+                               20,  # max life
+                               BROWN)
+            elif koops.invincible == 0:
+                # Damaged by enemy
+                koops.damage()
+        t = prof.lap("goombas", t)
+        
+        # Check spike collision
+        for platform in grid.platforms.sweep(koops.rect):
+            if platform.is_spike:
+                if (koops.x + koops.width > platform.x and 
+                    koops.x < platform.x + platform.width and
+                    koops.y + koops.height > platform.y and
+                    koops.y < platform.y + platform.height):
+                    # Player hit a spike
+                    if SPIKE_HIT == "bounce":
+                        koops.hit_points -= 1
+                        if koops.hit_points <= 0:
+                            self.lose_life()
+                        
+                        # Push player up
+                        koops.y = platform.y - koops.height - 10
+                        koops.velocity_y = -8
+                    else:
+                        koops.damage()
+                        # Push player away
+                        koops.velocity_y = -8
+                        if koops.x < platform.x + platform.width//2:
+                            koops.x = platform.x - koops.width - 5
+                        else:
+                            koops.x = platform.x + platform.width + 5
+                        
+                        # Add red damage particles
+                        particles.emit(koops.x + koops.width//2, 
+                                       koops.y + koops.height, 15,
+                                       (-3, 3), (-5, -3),
+                                       25,  # max life
+                                       RED)
+        
+        # Update lives based on hit points
+        if koops.hit_points <= 0:
+            self.lose_life()
+        
+        # Paper effect animation
+        if self.paper_timer > 0:
+            self.paper_timer -= 1
+            self.paper_alpha = min(150, self.paper_alpha + 10)
+        else:
+            self.paper_alpha = max(0, self.paper_alpha - 5)
+        
+        # Game over check
+        if self.lives <= 0:
+            self.game_state = GAME_STATES["GAME_OVER"]
+        prof.lap("physics", t)
+            
+    def lose_life(self):
+        koops = self.koops
+        self.lives -= 1
+        koops.hit_points = 3
+        koops.x = self.camera_offset + WIDTH//2 if RESPAWN_X is None else RESPAWN_X
+        koops.y = self.ground_level - 100
+        koops.velocity_y = 0
+        # Respawn is a teleport, so don't interpolate across it
+        koops.save_previous()
+        if PAPER_DEATH:
+            self.paper_timer = 30
+            
+    def state_digest(self):
+        # Short fingerprint of the simulation state, for regression checks
+        koops = self.koops
+        state = [self.game_state, self.collected_coins, self.lives,
+                 float(koops.x), float(koops.y), float(koops.velocity_y),
+                 koops.hit_points, koops.invincible]
+        state += [(goomba.x, goomba.crushed) for goomba in self.stage.goombas]
+        state += [coin.collected for coin in self.stage.coins]
+        state.append(len(self.particles))
+        return hashlib.sha1(repr(state).encode()).hexdigest()[:12]
+        
+    def invalidate(self):
+        # Forget what's on screen, so the next draw repaints all of it
+        self.drawn_state = None
+        
+    def draw(self, surface, alpha=1.0):
+        # alpha is how far we are between the last two simulation steps.
+        # Returns the rects that changed, or None if the whole surface did
+        if self.game_state != self.drawn_state:
+            self.menu_screen.invalidate()
+            self.boot_screen.invalidate()
+            if self.title_screen:
+                self.title_screen.invalidate()
+            self.drawn_state = self.game_state
+        
+        if self.game_state == GAME_STATES["TITLE"]:
+            # Draw the variant's title card
+            return self.title_screen.draw(surface)
+        
+        elif self.game_state == GAME_STATES["MENU"]:
+            # Draw main menu
+            return self.menu_screen.draw(surface, self.menu_selection)
+        
+        elif self.game_state == GAME_STATES["BOOT"]:
+            # Draw boot screen
+            return self.boot_screen.draw(surface, self.boot_progress)
+        
+        elif self.game_state == GAME_STATES["GAMEPLAY"] or self.game_state == GAME_STATES["GAME_OVER"]:
+            prof = self.profiler
+            t = prof.start()
+            camera_offset = lerp(self.prev_camera_offset, self.camera_offset, alpha)
+            
+            # Draw background
+            surface.fill(BACKGROUND)
+            if SCENERY:
+                draw_background(surface, camera_offset)
+            t = prof.lap("background", t)
+            
+            # Draw particles
+            self.particles.draw(surface, camera_offset, alpha)
+            t = prof.lap("particles", t)
+            
+            # Draw ground
+            draw_ground(surface, self.stage.ground, camera_offset)
+            t = prof.lap("background", t)
+            
+            # Cull against the visible stretch of world, once per frame
+            platforms, coins, goombas = self.stage.visible(
+                camera_offset, camera_offset + surface.get_width())
+            t = prof.lap("cull", t)
+            
+            # Draw platforms
+            for platform in platforms:
+                platform.draw(surface, camera_offset)
+            t = prof.lap("platforms", t)
+            
+            # Draw coins
+            for coin in coins:
+                coin.draw(surface, camera_offset)
+            t = prof.lap("sprites", t)
+            
+            # Draw Goombas
+            for goomba in goombas:
+                goomba.draw(surface, camera_offset, alpha)
+            t = prof.lap("goombas", t)
+            
+            # Draw Koops
+            self.koops.draw(surface, camera_offset, alpha)
+            t = prof.lap("sprites", t)
+            
+            # Draw UI
+            HUD(surface, self.collected_coins, self.lives)
+            t = prof.lap("ui", t)
+            
+            # Draw dialog box
+            self.dialog.draw(surface)
+            t = prof.lap("dialog", t)
+            
+            # Draw paper effect
+            if self.paper_alpha > 0:
+                draw_paper_effect(surface, self.paper_alpha)
+                t = prof.lap("ui", t)
+            
+            if self.game_state == GAME_STATES["GAME_OVER"]:
+                # Draw game over screen with parallax
+                overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+                overlay.fill((0, 0, 0, 150))
+                surface.blit(overlay, (0, 0))
+                
+                VectorFont.render_text(surface, "GAME OVER", 
+                                    WIDTH//2 - 100, HEIGHT//2 - 50, 
+                                    50, RED, WHITE, 5)
+                VectorFont.render_text(surface, "PRESS R TO RESTART", 
+                                    WIDTH//2 - 140, HEIGHT//2 + 30, 
+                                    28, YELLOW)
+                prof.lap("ui", t)
+
+def read_direction(keys):
+    dx = 0
+    if keys[pygame.K_a]:
+        dx = -1
+    if keys[pygame.K_d]:
+        dx = 1
+    return dx
+
+# Names usable in input scripts
+SCRIPT_KEYS = {
+    "left": pygame.K_a,
+    "right": pygame.K_d,
+    "jump": pygame.K_SPACE,
+    "crouch": pygame.K_s,
+    "run": pygame.K_LSHIFT,
+    "start": pygame.K_RETURN,
+    "restart": pygame.K_r,
+    "up": pygame.K_UP,
+    "down": pygame.K_DOWN
+}
+
+class ScriptedInput:
+    # Replays "<step> press|release <key>" commands against the simulation
+    def __init__(self, commands):
+        self.commands = {}
+        for step, action, name in commands:
+            if action not in ("press", "release") or name not in SCRIPT_KEYS:
+                raise ValueError(f"bad input command: {step} {action} {name}")
+            self.commands.setdefault(step, []).append((action, SCRIPT_KEYS[name]))
+        self.held = {key: False for key in SCRIPT_KEYS.values()}
+        
+    @classmethod
+    def from_file(cls, path):
+        commands = []
+        with open(path) as f:
+            for line in f:
+                line = line.split("#", 1)[0].split()
+                if line:
+                    step, action, name = line
+                    commands.append((int(step), action, name))
+        return cls(commands)
+    
+    @classmethod
+    def random(cls, seed, steps):
+        # Seeded button mashing, for fuzzing the physics
+        rng = random.Random(seed)
+        commands = []
+        held = set()
+        for step in range(0, steps, 10):
+            name = rng.choice(["left", "right", "jump", "crouch", "run"])
+            action = "release" if name in held else "press"
+            held.symmetric_difference_update([name])
+            commands.append((step, action, name))
+        return cls(commands)
+    
+    def events(self, step):
+        events = []
+        for action, key in self.commands.get(step, ()):
+            self.held[key] = action == "press"
+            event_type = pygame.KEYDOWN if action == "press" else pygame.KEYUP
+            events.append(pygame.event.Event(event_type, key=key))
+        return events
+
+def run_headless(steps, seed, script_path=None, sessions=1, profile_out=None,
+                 stage_path=None):
+    init_display(headless=True)
+    total_steps = 0
+    start = time.perf_counter()
+    
+    for session in range(sessions):
+        session_seed = seed + session
+        if script_path:
+            script = ScriptedInput.from_file(script_path)
+        else:
+            script = ScriptedInput.random(session_seed, steps)
+        
+        # Skip the menu and boot screen
+        game = Game(session_seed, stage_path, rewind_seconds=0)
+        game.start()
+        prof = game.profiler
+        if profile_out:
+            root, ext = os.path.splitext(profile_out)
+            prof.open_trace(profile_out if sessions == 1 else f"{root}.{session}{ext}")
+        
+        for step in range(steps):
+            for event in script.events(step):
+                game.handle_event(event)
+            game.update(read_direction(script.held))
+            prof.end_frame()
+        total_steps += steps
+        prof.close()
+        
+        print(f"session {session} seed {session_seed}: "
+              f"coins {game.collected_coins} lives {game.lives} "
+              f"digest {game.state_digest()}")
+    
+    elapsed = time.perf_counter() - start
+    print(f"{total_steps} steps in {elapsed:.2f}s "
+          f"({total_steps / elapsed:.0f} steps/s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=CAPTION)
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate without a display and report throughput")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for every random decision (default: unseeded, or 0 when headless)")
+    parser.add_argument("--script", help="headless input script of '<step> press|release <key>' lines")
+    parser.add_argument("--steps", type=int, default=SIM_HZ * 60,
+                        help="simulation steps per headless session")
+    parser.add_argument("--sessions", type=int, default=1,
+                        help="headless sessions to run, with consecutive seeds")
+    parser.add_argument("--stage", default=DEFAULT_STAGE,
+                        help="stage file to play")
+    parser.add_argument("--generate-stage", type=int, metavar="SCREENS",
+                        help="write a random stage this many screens long to --stage, then exit")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the frame profiler overlay shown (F3 toggles it)")
+    parser.add_argument("--profile-out",
+                        help="stream per-frame phase timings to a .csv or .jsonl file")
+    args = parser.parse_args(argv)
+    
+    if args.generate_stage:
+        if args.stage == DEFAULT_STAGE:
+            parser.error("--generate-stage needs an explicit --stage path")
+        generate_stage(args.stage, args.generate_stage, args.seed or 0)
+        return
+    
+    if args.headless:
+        run_headless(args.steps, args.seed or 0, args.script, args.sessions,
+                     args.profile_out, args.stage)
+        return
+    
+    screen = init_display()
+    
+    # Bake (or load) Koops' poses before the first frame
+    if KOOPS_ART is draw_koops:
+        get_koops_atlas()
+    
+    game = Game(args.seed, args.stage)
+    clock = pygame.time.Clock()
+    accumulator = 0.0
+    
+    prof = game.profiler
+    if args.profile:
+        prof.toggle_overlay()
+    if args.profile_out:
+        prof.open_trace(args.profile_out)
+    
+    # Main game loop
+    while game.running:
+        # Real time since the last frame, clamped so a stall can't snowball
+        fps = MENU_FPS if game.game_state in (GAME_STATES["MENU"], GAME_STATES["TITLE"]) else MAX_FPS
+        accumulator += min(clock.tick(fps) / 1000.0, MAX_FRAME_TIME)
+        t = prof.start()
+        
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.KEYDOWN and event.key == PROFILE_KEY:
+                prof.toggle_overlay()
+            game.handle_event(event)
+        
+        # Get pressed keys for continuous movement
+        dx = read_direction(pygame.key.get_pressed())
+        prof.lap("events", t)
+        
+        # Run as many fixed simulation steps as real time allows
+        while accumulator >= SIM_DT:
+            game.update(dx)
+            accumulator -= SIM_DT
+        
+        # The overlay is drawn over whatever was there, so it needs a clean slate
+        if prof.show_overlay:
+            game.invalidate()
+        dirty = game.draw(screen, accumulator / SIM_DT)
+        
+        t = prof.start()
+        prof.draw_overlay(screen)
+        if dirty is None:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        prof.lap("present", t)
+        prof.end_frame()
+
+    prof.close()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    main()